@@ -1,430 +1,626 @@
-from fastapi import APIRouter, Depends, HTTPException, Header
+from fastapi import APIRouter, Depends, HTTPException, Header, Query, Response
+from fastapi.responses import StreamingResponse
+import base64
+import hashlib
+import json
+import logging
+import math
 import os
-import zlib
-from sqlalchemy.orm import Session, selectinload
-from app.db import get_db
-from app.models.sql_models import Review as ReviewORM, ReviewCategory as ReviewCategoryORM
-from app.models.review import Review, ReviewResponse
-from typing import Any, Optional
+import time
+from datetime import datetime, timezone
+from decimal import Decimal
+from sqlalchemy import and_, delete, exists, func, insert, literal_column, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app import compression, data_version, search
+from app.db import AsyncReadSessionLocal, get_async_db, get_async_read_db
+from app.metrics import (
+    MetricsDelta,
+    category_average,
+    month_key,
+    previous_months,
+    serialize_listing_metrics,
+    serialize_trends,
+)
+from app.models.sql_models import (
+    ListingMetrics as ListingMetricsORM,
+    Review as ReviewORM,
+    ReviewCategory as ReviewCategoryORM,
+    ReviewRollup as ReviewRollupORM,
+)
+from app.models.review import (
+    ListingMetricsResponse,
+    ModeratedReview,
+    Review,
+    ReviewResponse,
+    ReviewSearchResponse,
+    TrendsResponse,
+    VisibilityResponse,
+    VisibilityUpdate,
+)
+from app.response_cache import reviews_cache
+from app.timestamps import parse_timestamp
+from typing import Any, AsyncIterator, Literal, Optional
+
+try:
+    import orjson
+except ImportError:  # stdlib fallback renders the same bytes, just slower
+    orjson = None
 
 router = APIRouter(prefix="/api/reviews", tags=["reviews"])
 
 
 TOKEN = os.getenv("DASHBOARD_TOKEN", "theflex-demo")
-# HOSTAWAY API
-HOSTAWAY_AUTH_URL = os.getenv("HOSTAWAY_AUTH_URL", "https://api.hostaway.com/v1/accessTokens")
-HOSTAWAY_API_URL = os.getenv("HOSTAWAY_API_URL", "https://api.hostaway.com/v1/reviews")
-HOSTAWAY_CLIENT_ID = os.getenv("HOSTAWAY_CLIENT_ID", "hostaway")
-HOSTAWAY_CLIENT_SECRET = os.getenv("HOSTAWAY_CLIENT_SECRET", "secret")
-# GOOGLE REVIEWS API (GOOGLE BUSINESS PROFILE API)
-GOOGLE_BUSINESS_PROFILE_ACCOUNT_ID = os.getenv("GOOGLE_BUSINESS_PROFILE_ACCOUNT_ID", "google")
-GOOGLE_SERVICE_ACCOUNT_FILE = "service_account.json"
-GOOGLE_BUSINESS_PROFILE_API_SCOPES = ["https://www.googleapis.com/auth/business.manage"]
-
-
-@router.get("/hostaway", response_model=ReviewResponse)
-def get_reviews(
-    include_hidden: bool = False,
-    authorization: str | None = Header(default=None),
-    db: Session = Depends(get_db),
-):
-    # Fetch and upsert external reviews (Hostaway and Google) only when configured
+
+logger = logging.getLogger(__name__)
+
+# Provider-owned columns rewritten on upsert; 'hidden' is admin-controlled and never overwritten
+_UPSERT_COLUMNS = ("type", "status", "rating", "publicReview", "submittedAt", "guestName", "listingName", "channel")
+_UPSERT_DEFAULTS = {
+    "type": "host-to-guest",
+    "status": "published",
+    "rating": None,
+    "publicReview": "",
+    "submittedAt": "",
+    "guestName": "",
+    "listingName": "",
+    "channel": None,
+}
+# Ids per SELECT ... IN (...) / DELETE batch; stays under SQLite's bound-parameter limit
+_ID_CHUNK_SIZE = 500
+_VARY = {"Vary": "Accept-Encoding"}
+# Fields of the Review schema, in its declared order (reviewCategory is added separately)
+_REVIEW_FIELDS = tuple(f for f in Review.model_fields if f != "reviewCategory")
+_REVIEW_COLUMNS = tuple(getattr(ReviewORM, f) for f in _REVIEW_FIELDS)
+
+
+def _score_expr():
+    # Null scores count as 0, matching the dashboard; same expression as the ix_reviews_*score indexes.
+    # The 0 must render literally: SQLite won't match a bound parameter against an expression index.
+    return func.coalesce(ReviewORM.categoryAverage, literal_column("0"))
+
+
+def _encode_cursor(sort: str, key: Any, rid: int) -> str:
+    raw = json.dumps([sort, key, rid], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str, sort: str) -> tuple[Any, int]:
+    """Return the (sort key, id) a cursor points after; 400 unless it was issued for ``sort``."""
     try:
-        combined: list[dict] = []
-
-        # Hostaway: only call if client creds are provided
-        hostaway = None
-        if os.getenv("HOSTAWAY_CLIENT_ID") and os.getenv("HOSTAWAY_CLIENT_SECRET"):
-            hostaway = get_hostaway_reviews()
-        if hostaway:
-            combined.extend(hostaway)
-
-        # Google: only call if service account credentials are available (env JSON or file)
-        google = None
-        if os.getenv("GOOGLE_SERVICE_ACCOUNT_JSON") or os.path.exists(GOOGLE_SERVICE_ACCOUNT_FILE):
-            google = get_google_business_profile_reviews()
-        if google:
-            combined.extend(google)
-
-        if combined:
-            upsert_reviews_from_normalized(db, combined)
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_sort, key, rid = json.loads(raw)
+        if cursor_sort != sort or isinstance(rid, bool) or not isinstance(rid, int):
+            raise ValueError("bad cursor")
+        if sort in ("newest", "oldest"):
+            if not isinstance(key, str):
+                raise ValueError("bad cursor key")
+            key = datetime.fromisoformat(key)
+        elif isinstance(key, bool) or not isinstance(key, (int, float)) or not math.isfinite(key):
+            raise ValueError("bad cursor key")
+        return key, rid
     except Exception:
-        # Don't fail the endpoint if external providers are unavailable
-        pass
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
 
-    query = db.query(ReviewORM).options(selectinload(ReviewORM.reviewCategory))
-    if include_hidden:
-        if authorization != f"Bearer {TOKEN}":
-            raise HTTPException(status_code=401, detail="Unauthorized")
+@router.get("/hostaway", response_model=ReviewResponse | ReviewSearchResponse)
+async def get_reviews(
+    include_hidden: bool = False,
+    type: Optional[str] = None,
+    channel: Optional[str] = None,
+    category: Optional[str] = None,
+    listing: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    min_score: Optional[float] = None,
+    max_score: Optional[float] = None,
+    q: Optional[str] = Query(default=None, max_length=200),
+    sort: Optional[Literal["newest", "oldest", "highest", "lowest", "relevance"]] = None,
+    limit: Optional[int] = Query(default=None, ge=1, le=500),
+    cursor: Optional[str] = None,
+    stream: bool = False,
+    authorization: str | None = Header(default=None),
+    if_none_match: str | None = Header(default=None),
+    if_modified_since: str | None = Header(default=None),
+    accept_encoding: str | None = Header(default=None),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    """List reviews, optionally filtered, sorted and paginated.
+
+    Without ``limit`` every matching review is returned; ``stream=true``
+    then sends it row batch by row batch from a server-side cursor, so
+    memory stays flat for large lists. With ``limit`` the response carries a
+    ``nextCursor`` to pass back as ``cursor`` for the next page (keyset
+    pagination on the sort key and id). Scores are filtered as
+    ``min_score <= score < max_score``. ``q`` is a full-text search over
+    the review text, guest and listing names (every word, prefix-matched);
+    results then default to relevance order and carry a highlighted
+    ``snippet``. Responses carry an ETag and
+    Last-Modified; matching conditional requests get a 304. Bodies are
+    gzip/brotli compressed when the client accepts it.
+    """
+    if include_hidden and authorization != f"Bearer {TOKEN}":
+        raise HTTPException(status_code=401, detail="Unauthorized")
+    streaming = stream and limit is None
+    terms = search.search_terms(q)
+    sort = sort or ("relevance" if terms else "newest")
+    cache_key = (
+        include_hidden, type, channel, category, listing, since, until, min_score, max_score,
+        tuple(terms), sort, limit, cursor, streaming,
+    )
+    encoding = compression.negotiate(accept_encoding)
+    version, modified_at = await data_version.current(db)
+    variant = _variant(cache_key) + (f"-{encoding}" if encoding else "")
+    headers = data_version.validators(version, modified_at, variant)
+    unchanged = data_version.not_modified({**headers, **_VARY}, if_none_match, if_modified_since)
+    if unchanged is not None:
+        return unchanged
+    # Repeated identical reads are served from the serialized-response cache
+    cached = None if streaming else reviews_cache.get((cache_key, encoding))
+    if cached is not None:
+        return _encoded_response(*cached, headers)
+    cache_version = reviews_cache.version
+
+    # External providers are synced in the background (app/sync.py); reads only hit the DB
+    # Column-only SELECT; rows are rendered straight to JSON without ORM objects or Pydantic
+    query = select(*_REVIEW_COLUMNS)
+    if not include_hidden:
+        query = query.where(ReviewORM.hidden.is_(False))
+
+    if type:
+        query = query.where(ReviewORM.type == type)
+    if channel:
+        query = query.where(ReviewORM.channel == channel)
+    if listing:
+        query = query.where(ReviewORM.listingName == listing)
+    if category:
+        query = query.where(
+            exists().where(
+                ReviewCategoryORM.review_id == ReviewORM.id,
+                ReviewCategoryORM.category == category,
+            )
+        )
+    if since:
+        query = query.where(ReviewORM.submittedAtUtc >= parse_timestamp(since))
+    if until:
+        query = query.where(ReviewORM.submittedAtUtc < parse_timestamp(until))
+
+    # Reviews without a score never match a score filter
+    score = _score_expr()
+    if min_score is not None:
+        query = query.where(ReviewORM.categoryAverage.is_not(None), score >= min_score)
+    if max_score is not None:
+        query = query.where(ReviewORM.categoryAverage.is_not(None), score < max_score)
+
+    relevance = snippet = None
+    if terms:
+        query, relevance, snippet = search.apply_search(query, terms, db.bind.dialect.name)
+        if snippet is not None:
+            query = query.add_columns(snippet)
+    if sort == "relevance" and relevance is None:
+        # Without a search (or a backend that can rank) relevance means newest
+        sort = "newest"
+
+    by_date = sort in ("newest", "oldest")
+    if sort == "relevance":
+        sort_key = relevance
     else:
-        query = query.filter(ReviewORM.hidden.is_(False))
-    rows = query.order_by(ReviewORM.submittedAt.desc()).all()
-    return {"status": "success", "result": rows}
+        sort_key = ReviewORM.submittedAtUtc if by_date else score
+    descending = sort in ("newest", "highest", "relevance")
+    with_snippets = snippet is not None
+    if cursor:
+        key, rid = _decode_cursor(cursor, sort)
+        if descending:
+            query = query.where(or_(sort_key < key, and_(sort_key == key, ReviewORM.id < rid)))
+        else:
+            query = query.where(or_(sort_key > key, and_(sort_key == key, ReviewORM.id > rid)))
+    if descending:
+        query = query.order_by(sort_key.desc(), ReviewORM.id.desc())
+    else:
+        query = query.order_by(sort_key.asc(), ReviewORM.id.asc())
+
+    if streaming:
+        if encoding:
+            headers.update(_VARY, **{"Content-Encoding": encoding})
+        chunks = compression.compress_stream(_stream_reviews(query, with_snippets), encoding)
+        return StreamingResponse(chunks, media_type="application/json", headers=headers)
+
+    if limit is None:
+        rows = (await db.execute(query)).all()
+        body = render_reviews(await _review_dicts(db, rows, with_snippets))
+        return await _cached_json_response((cache_key, encoding), cache_version, body, headers, encoding)
+
+    rows = (await db.execute(query.add_columns(sort_key).limit(limit + 1))).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last_key = rows[-1][-1]
+        if isinstance(last_key, datetime):
+            last_key = last_key.isoformat()
+        elif isinstance(last_key, Decimal):
+            last_key = float(last_key)
+        next_cursor = _encode_cursor(sort, last_key, rows[-1][0])
+    body = render_reviews(await _review_dicts(db, rows, with_snippets), next_cursor)
+    return await _cached_json_response((cache_key, encoding), cache_version, body, headers, encoding)
+
+
+async def _review_dicts(db: AsyncSession, rows: list, with_snippets: bool = False) -> list[dict]:
+    """Turn ``_REVIEW_COLUMNS`` rows into Review-shaped dicts with their categories.
+
+    With ``with_snippets`` the column after them is the search snippet.
+    """
+    reviews = [dict(zip(_REVIEW_FIELDS, row)) for row in rows]
+    by_id: dict[int, list[dict]] = {}
+    for review, row in zip(reviews, rows):
+        review["reviewCategory"] = by_id.setdefault(review["id"], [])
+        if with_snippets:
+            review["snippet"] = search.render_snippet(row[len(_REVIEW_FIELDS)])
+    ids = list(by_id)
+    for start in range(0, len(ids), _ID_CHUNK_SIZE):
+        chunk = ids[start : start + _ID_CHUNK_SIZE]
+        result = await db.execute(
+            select(ReviewCategoryORM.review_id, ReviewCategoryORM.category, ReviewCategoryORM.rating)
+            .where(ReviewCategoryORM.review_id.in_(chunk))
+            .order_by(ReviewCategoryORM.id)
+        )
+        for review_id, cat, rating in result:
+            by_id[review_id].append({"category": cat, "rating": rating})
+    return reviews
+
+
+async def _stream_reviews(query, with_snippets: bool = False) -> AsyncIterator[bytes]:
+    # Own session: the generator runs while the response is being sent
+    async with AsyncReadSessionLocal() as db:
+        result = await db.stream(query.execution_options(yield_per=_ID_CHUNK_SIZE))
+        # Same bytes as render_reviews(), emitted one batch of rows at a time
+        yield b'{"status":"success","result":['
+        separator = b""
+        async for rows in result.partitions():
+            reviews = await _review_dicts(db, rows, with_snippets)
+            yield separator + b",".join(_dumps(r) for r in reviews)
+            separator = b","
+        yield b'],"nextCursor":null}'
+
+
+def render_reviews(reviews: list[dict], next_cursor: Optional[str] = None) -> bytes:
+    """Encode a reviews list to the exact bytes of ReviewResponse.model_dump_json()."""
+    return _dumps({"status": "success", "result": reviews, "nextCursor": next_cursor})
+
+
+def _dumps(obj: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
 
+def _variant(key: tuple) -> str:
+    # Distinguishes representations of the same data version in the ETag
+    return hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:16]
 
-@router.patch("/{review_id}/hide", response_model=Review)
-def hide_review(
+
+async def _cached_json_response(
+    key: tuple, version: int, body: bytes, headers: dict[str, str], encoding: Optional[str]
+) -> Response:
+    body, used = await compression.compress_body(body, encoding)
+    reviews_cache.put(key, (body, used), version, len(body))
+    return _encoded_response(body, used, headers)
+
+
+def _encoded_response(body: bytes, content_encoding: Optional[str], headers: dict[str, str]) -> Response:
+    if content_encoding:
+        # Uncompressed bodies get Vary from GZipMiddleware, which skips encoded ones
+        headers = {**headers, **_VARY, "Content-Encoding": content_encoding}
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@router.patch("/{review_id}/hide", response_model=ModeratedReview, response_model_exclude_unset=True)
+async def hide_review(
     review_id: int,
+    include_categories: bool = False,
     authorization: str | None = Header(default=None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     if authorization != f"Bearer {TOKEN}":
         raise HTTPException(status_code=401, detail="Unauthorized")
-    review = db.get(ReviewORM, review_id)
-    if not review:
-        raise HTTPException(status_code=404, detail="Review not found")
-    review.hidden = True
-    db.add(review)
-    db.commit()
-    db.refresh(review)
-    return review
+    return await _set_hidden(db, review_id, True, include_categories)
 
 
-@router.patch("/{review_id}/show", response_model=Review)
-def show_review(
+@router.patch("/{review_id}/show", response_model=ModeratedReview, response_model_exclude_unset=True)
+async def show_review(
     review_id: int,
+    include_categories: bool = False,
     authorization: str | None = Header(default=None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     if authorization != f"Bearer {TOKEN}":
         raise HTTPException(status_code=401, detail="Unauthorized")
-    review = db.get(ReviewORM, review_id)
-    if not review:
-        raise HTTPException(status_code=404, detail="Review not found")
-    review.hidden = False
-    db.add(review)
-    db.commit()
-    db.refresh(review)
+    return await _set_hidden(db, review_id, False, include_categories)
+
+
+async def _set_hidden(db: AsyncSession, review_id: int, hidden: bool, include_categories: bool) -> dict:
+    # The review comes back from the UPDATE itself; it is only re-read when nothing changed
+    fields = _REVIEW_COLUMNS + (ReviewORM.submittedAtUtc,)
+    changed = await _flip_hidden(db, [review_id], hidden, fields)
+    if changed:
+        row = changed[0]
+    else:
+        row = (await db.execute(select(*fields).where(ReviewORM.id == review_id))).first()
+        if row is None:
+            raise HTTPException(status_code=404, detail="Review not found")
+    review = (await _review_dicts(db, [row]))[0] if include_categories else dict(zip(_REVIEW_FIELDS, row))
+    review["hidden"] = hidden
+    await _commit_visibility(db, [dict(review, submittedAtUtc=row[-1])] if changed else [], hidden)
     return review
 
-def get_hostaway_access_token() -> str | None:
-    try:
-        import httpx
-        resp = httpx.post(
-            HOSTAWAY_AUTH_URL,
-            headers={"Content-Type": "application/x-www-form-urlencoded"},
-            data={
-                "grant_type": "client_credentials",
-                "client_id": HOSTAWAY_CLIENT_ID,
-                "client_secret": HOSTAWAY_CLIENT_SECRET,
-                "scope": "general",
-            },
-            timeout=10,
+
+async def _flip_hidden(db: AsyncSession, ids: list[int], hidden: bool, fields: tuple) -> list:
+    """Set ``hidden`` on ``ids`` and return ``fields`` of the rows whose state actually flipped."""
+    stmt = (
+        update(ReviewORM)
+        .where(ReviewORM.id.in_(ids), ReviewORM.hidden != hidden)
+        .values(hidden=hidden)
+        .execution_options(synchronize_session=False)
+    )
+    if db.bind.dialect.update_returning:
+        rows = (await db.execute(stmt.returning(*fields))).all()
+    else:
+        query = select(*fields).where(ReviewORM.id.in_(ids), ReviewORM.hidden != hidden).with_for_update()
+        rows = (await db.execute(query)).all()
+        if rows:
+            await db.execute(stmt)
+    return rows
+
+
+async def _commit_visibility(db: AsyncSession, changed: list[dict], hidden: bool) -> None:
+    # Aggregates, the data version and caches move once per transaction, however many rows flipped
+    if changed:
+        delta = MetricsDelta()
+        for review in changed:
+            delta.visibility(review, -1 if hidden else 1)
+        await db.run_sync(delta.apply)
+        await db.execute(data_version.bump_statement())
+    await db.commit()
+    if changed:
+        data_version.mark_changed()
+
+
+@router.patch("/visibility", response_model=VisibilityResponse)
+async def set_visibility(
+    body: VisibilityUpdate,
+    authorization: str | None = Header(default=None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    # Hide or show many reviews in one transaction; reports each id's outcome
+    if authorization != f"Bearer {TOKEN}":
+        raise HTTPException(status_code=401, detail="Unauthorized")
+    ids = list(dict.fromkeys(body.ids))
+    fields = (ReviewORM.id, ReviewORM.listingName, ReviewORM.channel, ReviewORM.submittedAtUtc)
+    changed = [row._asdict() for row in await _flip_hidden(db, ids, body.hidden, fields)]
+    updated = {row["id"] for row in changed}
+    rest = [rid for rid in ids if rid not in updated]
+    found = set((await db.scalars(select(ReviewORM.id).where(ReviewORM.id.in_(rest)))).all()) if rest else set()
+    await _commit_visibility(db, changed, body.hidden)
+
+    result = [
+        {"id": rid, "result": "updated" if rid in updated else "unchanged" if rid in found else "not_found"}
+        for rid in ids
+    ]
+    return {"status": "success", "updated": len(updated), "result": result}
+
+
+@router.get("/metrics/listings", response_model=ListingMetricsResponse)
+async def get_listing_metrics(
+    response: Response,
+    authorization: str | None = Header(default=None),
+    if_none_match: str | None = Header(default=None),
+    if_modified_since: str | None = Header(default=None),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    # Served from the materialized listing_metrics table; includes hidden reviews
+    if authorization != f"Bearer {TOKEN}":
+        raise HTTPException(status_code=401, detail="Unauthorized")
+    version, modified_at = await data_version.current(db)
+    # Weak: GZipMiddleware may compress this body
+    headers = data_version.validators(version, modified_at, "listing-metrics", weak=True)
+    unchanged = data_version.not_modified(headers, if_none_match, if_modified_since)
+    if unchanged is not None:
+        return unchanged
+    response.headers.update(headers)
+    rows = (
+        await db.scalars(
+            select(ListingMetricsORM).order_by(ListingMetricsORM.total.desc(), ListingMetricsORM.listingName)
         )
-        if resp.status_code == 200:
-            data = resp.json()
-            return data.get("access_token")
-        return None
-    except Exception:
-        return None
+    ).all()
+    return {"status": "success", "result": [serialize_listing_metrics(r) for r in rows]}
 
 
-def get_hostaway_reviews():
-    try:
-        token = get_hostaway_access_token()
-        if not token:
-            return None
-
-        import httpx
-        resp = httpx.get(
-            HOSTAWAY_API_URL,
-            headers={"Authorization": f"Bearer {token}"},
-            timeout=10,
-        )
-        if resp.status_code == 200:
-            data = resp.json()
-            return normalize_hostaway_response(data)
+@router.get("/metrics/trends", response_model=TrendsResponse)
+async def get_trends(
+    response: Response,
+    months: int = Query(12, ge=1, le=120),
+    until: Optional[str] = Query(None, pattern=r"^\d{4}-(0[1-9]|1[0-2])$", description="Last month, YYYY-MM"),
+    listing: Optional[str] = None,
+    channel: Optional[str] = None,
+    authorization: str | None = Header(default=None),
+    if_none_match: str | None = Header(default=None),
+    if_modified_since: str | None = Header(default=None),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    # Served from the review_rollups table only; includes hidden reviews (see `visible`)
+    if authorization != f"Bearer {TOKEN}":
+        raise HTTPException(status_code=401, detail="Unauthorized")
+    window = previous_months(until or month_key(datetime.now(timezone.utc)), months)
+    version, modified_at = await data_version.current(db)
+    variant = "trends-" + _variant((tuple(window), listing, channel))
+    headers = data_version.validators(version, modified_at, variant, weak=True)
+    unchanged = data_version.not_modified(headers, if_none_match, if_modified_since)
+    if unchanged is not None:
+        return unchanged
+    response.headers.update(headers)
+    query = select(ReviewRollupORM).where(ReviewRollupORM.month.between(window[0], window[-1]))
+    if listing:
+        query = query.where(ReviewRollupORM.listingName == listing)
+    if channel:
+        query = query.where(ReviewRollupORM.channel == channel)
+    rows = (await db.scalars(query)).all()
+    return {"status": "success", "months": window, "result": serialize_trends(rows, window)}
+
+
+def _prepare_upsert_item(it: Any) -> tuple[dict, list[dict]] | None:
+    if not isinstance(it, dict):
         return None
-    except Exception:
+    rid = it.get("id")
+    if not isinstance(rid, int):
+        # skip items without a proper integer id
         return None
-
-
-def normalize_hostaway_response(data: Any) -> list[dict]:
-    """Normalize Hostaway API response to canonical Review dicts."""
-    items: list[dict] = []
-    if not data:
-        return items
-    # Try to find the list of reviews in common keys
-    candidates: list = []
-    if isinstance(data, dict):
-        for key in ("result", "results", "data", "reviews", "list"):
-            val = data.get(key)
-            if isinstance(val, list):
-                candidates = val
-                break
-        if not candidates:
-            for val in data.values():
-                if isinstance(val, list):
-                    candidates = val
-                    break
-    elif isinstance(data, list):
-        candidates = data
-    for it in candidates or []:
-        if not isinstance(it, dict):
-            continue
-        rid = it.get("id") or it.get("reviewId") or it.get("reservationId")
+    categories: list[dict] = []
+    for c in (it.get("reviewCategory") or []):
         try:
-            rid_int = int(rid) if rid is not None else None
+            categories.append({"review_id": rid, "category": str(c.get("category", "")), "rating": int(c.get("rating", 0))})
         except Exception:
-            # skip items without a usable integer id
-            continue
-        rating_val = it.get("rating") or it.get("overall") or it.get("stars")
-        try:
-            rating_int = int(rating_val) if rating_val is not None else None
-        except Exception:
-            rating_int = None
-        # Categories can be list or dict
-        categories: list[dict] = []
-        rc = it.get("reviewCategory") or it.get("categories") or it.get("ratings") or it.get("scores") or {}
-        if isinstance(rc, list):
-            for c in rc:
-                if not isinstance(c, dict):
-                    continue
-                cat = c.get("category") or c.get("name")
-                score = c.get("rating") or c.get("score") or c.get("value")
-                if cat is not None and score is not None:
-                    try:
-                        categories.append({"category": str(cat), "rating": int(score)})
-                    except Exception:
-                        pass
-        elif isinstance(rc, dict):
-            for cat, score in rc.items():
-                if score is not None:
-                    try:
-                        categories.append({"category": str(cat), "rating": int(score)})
-                    except Exception:
-                        pass
-        # Fallback specific keys for known categories
-        for key in ("cleanliness", "communication", "respect_house_rules", "accuracy", "location", "value", "check_in"):
-            if key in it and it.get(key) is not None:
-                try:
-                    categories.append({"category": key, "rating": int(it.get(key))})
-                except Exception:
-                    pass
-        items.append(
-            {
-                "id": rid_int,
-                "type": it.get("type", "host-to-guest"),
-                "status": it.get("status", "published"),
-                "rating": rating_int,
-                "publicReview": it.get("publicReview") or it.get("comment") or it.get("review") or it.get("text") or "",
-                "submittedAt": it.get("submittedAt") or it.get("createdAt") or it.get("createTime") or "",
-                "guestName": it.get("guestName") or (it.get("guest") or {}).get("name") or (it.get("reviewer") or {}).get("displayName") or "",
-                "listingName": it.get("listingName") or (it.get("listing") or {}).get("name") or it.get("propertyName") or "",
-                "channel": it.get("channel") or it.get("source") or "Hostaway",
-                "hidden": False,
-                "reviewCategory": categories,
-            }
-        )
-    return items
+            # skip malformed category entries
+            pass
+    # Only keys present in the payload overwrite existing values ('rating' always does)
+    values = {k: it[k] for k in _UPSERT_COLUMNS if k in it}
+    values["id"] = rid
+    values["rating"] = it.get("rating")
+    return values, categories
+
+
+def review_content_hash(values: dict, categories: list[dict]) -> str:
+    """Stable hash of a review's provider-owned fields and its sorted categories."""
+    payload = {col: values.get(col) for col in _UPSERT_COLUMNS}
+    payload["reviewCategory"] = sorted((c["category"], c["rating"]) for c in categories)
+    raw = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _review_upsert_statement(db: Session):
+    # Dialect-native upsert that never touches the admin-controlled 'hidden' flag
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    elif dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        return None
+    # Table-level statement: the ORM bulk path drops None keys per row and splits the executemany
+    stmt = dialect_insert(ReviewORM.__table__)
+    return stmt.on_conflict_do_update(
+        index_elements=[ReviewORM.id],
+        set_={col: stmt.excluded[col] for col in _UPSERT_COLUMNS + ("contentHash", "submittedAtUtc", "categoryAverage")},
+    )
 
 
 def upsert_reviews_from_normalized(db: Session, items: list[dict]) -> dict:
     """Upsert a list of normalized review dicts into the database.
 
     Preserves the 'hidden' flag on existing rows and replaces categories to
-    match the provided payload. Returns counts of updated and created rows.
+    match the provided payload. Returns counts of updated, created and
+    unchanged rows; rows whose content hash matches are not written at all.
+
+    Works set-based in chunks: one SELECT for the existing rows, one
+    executemany upsert for reviews and one DELETE plus one executemany
+    INSERT for their categories.
     """
+    started = time.perf_counter()
+    prepared: dict[int, tuple[dict, list[dict]]] = {}
+    for it in items or []:
+        entry = _prepare_upsert_item(it)
+        if entry is not None and entry[0]["id"] not in prepared:
+            prepared[entry[0]["id"]] = entry
+
     updated = 0
     created = 0
-    seen: set[int] = set()
-
-    for it in items or []:
-        if not isinstance(it, dict):
-            continue
-        rid = it.get("id")
-        if not isinstance(rid, int):
-            # skip items without a proper integer id
-            continue
-        if rid in seen:
+    unchanged = 0
+    delta = MetricsDelta()
+    upsert_stmt = _review_upsert_statement(db)
+    ids = list(prepared)
+
+    for start in range(0, len(ids), _ID_CHUNK_SIZE):
+        chunk = ids[start : start + _ID_CHUNK_SIZE]
+        existing = {
+            row["id"]: dict(row, reviewCategory=[])
+            for row in db.execute(select(*ReviewORM.__table__.c).where(ReviewORM.id.in_(chunk))).mappings()
+        }
+
+        review_rows: list[dict] = []
+        category_rows: list[dict] = []
+        new_rows: list[dict] = []
+        changed_ids: list[int] = []
+        for rid in chunk:
+            values, categories = prepared[rid]
+            old = existing.get(rid)
+            if old is not None:
+                row = {col: values.get(col, old[col]) for col in _UPSERT_COLUMNS}
+                row.update(id=rid, hidden=old["hidden"])
+            else:
+                row = dict(_UPSERT_DEFAULTS, **values)
+                row["hidden"] = False
+            row["contentHash"] = review_content_hash(row, categories)
+            row["submittedAtUtc"] = parse_timestamp(row["submittedAt"])
+            row["categoryAverage"] = category_average([c["rating"] for c in categories], row["rating"])
+            if old is not None:
+                if old["contentHash"] == row["contentHash"]:
+                    # Nothing changed: no review write, no category churn
+                    unchanged += 1
+                    continue
+                changed_ids.append(rid)
+                updated += 1
+            else:
+                new_rows.append(row)
+                created += 1
+            review_rows.append(row)
+            category_rows.extend(categories)
+            delta.add(dict(row, reviewCategory=categories))
+
+        if changed_ids:
+            # Old categories are only needed to back out listing metrics for changed rows
+            for rid, category, rating in db.execute(
+                select(ReviewCategoryORM.review_id, ReviewCategoryORM.category, ReviewCategoryORM.rating).where(
+                    ReviewCategoryORM.review_id.in_(changed_ids)
+                )
+            ):
+                existing[rid]["reviewCategory"].append({"category": category, "rating": rating})
+            for rid in changed_ids:
+                delta.remove(existing[rid])
+
+        if not review_rows:
             continue
-        seen.add(rid)
-
-        row = db.get(ReviewORM, rid)
-        if row:
-            # Preserve admin-controlled 'hidden'
-            hidden_val = row.hidden
-            row.type = it.get("type", row.type)
-            row.status = it.get("status", row.status)
-            row.rating = it.get("rating")
-            row.publicReview = it.get("publicReview", row.publicReview)
-            row.submittedAt = it.get("submittedAt", row.submittedAt)
-            row.guestName = it.get("guestName", row.guestName)
-            row.listingName = it.get("listingName", row.listingName)
-            row.channel = it.get("channel", row.channel)
-
-            # Replace categories
-            for c in list(row.reviewCategory or []):
-                db.delete(c)
-            for c in (it.get("reviewCategory") or []):
-                try:
-                    row.reviewCategory.append(
-                        ReviewCategoryORM(
-                            category=str(c.get("category", "")),
-                            rating=int(c.get("rating", 0)),
-                        )
-                    )
-                except Exception:
-                    # skip malformed category entries
-                    pass
-
-            row.hidden = hidden_val
-            db.add(row)
-            updated += 1
+        if upsert_stmt is not None:
+            db.execute(upsert_stmt, review_rows)
         else:
-            # Create new row
-            row = ReviewORM(
-                id=rid,
-                type=it.get("type", "host-to-guest"),
-                status=it.get("status", "published"),
-                rating=it.get("rating"),
-                publicReview=it.get("publicReview", ""),
-                submittedAt=it.get("submittedAt", ""),
-                guestName=it.get("guestName", ""),
-                listingName=it.get("listingName", ""),
-                channel=it.get("channel"),
-                hidden=False,
-            )
-            for c in (it.get("reviewCategory") or []):
-                try:
-                    row.reviewCategory.append(
-                        ReviewCategoryORM(
-                            category=str(c.get("category", "")),
-                            rating=int(c.get("rating", 0)),
-                        )
-                    )
-                except Exception:
-                    pass
-            db.add(row)
-            created += 1
+            # Portable fallback: bulk INSERT new rows, bulk UPDATE by primary key for the rest
+            if new_rows:
+                db.execute(insert(ReviewORM.__table__), new_rows)
+            changed = [{k: v for k, v in r.items() if k != "hidden"} for r in review_rows if r["id"] in existing]
+            if changed:
+                db.execute(update(ReviewORM), changed)
+        if changed_ids:
+            db.execute(delete(ReviewCategoryORM).where(ReviewCategoryORM.review_id.in_(changed_ids)))
+        if category_rows:
+            db.execute(insert(ReviewCategoryORM), category_rows)
 
     if updated or created:
+        delta.apply(db)
+        db.execute(data_version.bump_statement())
         db.commit()
-    return {"updated": updated, "created": created}
-
-
-def get_google_service_account_access_token() -> Optional[str]:
-    try:
-        from google.oauth2 import service_account
-        import google.auth.transport.requests
-        import json
-
-        json_env = os.getenv("GOOGLE_SERVICE_ACCOUNT_JSON")
-        if json_env:
-            info = json.loads(json_env)
-            credentials = service_account.Credentials.from_service_account_info(
-                info, scopes=GOOGLE_BUSINESS_PROFILE_API_SCOPES
-            )
-        else:
-            credentials = service_account.Credentials.from_service_account_file(
-                GOOGLE_SERVICE_ACCOUNT_FILE, scopes=GOOGLE_BUSINESS_PROFILE_API_SCOPES
-            )
-        credentials.refresh(google.auth.transport.requests.Request())
-        return credentials.token
-    except Exception:
-        return None
+        # Core statements bypass the identity map; drop any stale loaded rows
+        db.expire_all()
+        data_version.mark_changed()
+    elapsed = time.perf_counter() - started
+    if ids:
+        logger.info(
+            "Upserted %d reviews (%d created, %d updated, %d unchanged) in %.3fs (%.0f rows/s)",
+            len(ids), created, updated, unchanged, elapsed, len(ids) / elapsed if elapsed else 0,
+        )
+    return {"updated": updated, "created": created, "unchanged": unchanged}
 
 
-def get_google_business_profile_reviews():
-    token = get_google_service_account_access_token()
-    if not token:
-        return None
-    url = f"https://mybusiness.googleapis.com/v4/accounts/{GOOGLE_BUSINESS_PROFILE_ACCOUNT_ID}/locations:batchGetReviews"
-    headers = {"Authorization": f"Bearer {token}"}
-
-    # If you know your location IDs, pass them in locationNames
-    payload = {"locationNames": []}
-
-    import httpx
-    with httpx.Client(timeout=10) as client:
-        resp = client.post(url, headers=headers, json=payload)
-        resp.raise_for_status()  # raises if status != 2xx
-        data = resp.json()
-        return normalize_google_response(data)
-
-
-def normalize_google_response(data: Any) -> list[dict]:
-    items: list[dict] = []
-    if not data:
-        return items
-
-    # 'batchGetReviews' style
-    container_keys = ("locationReviews", "locations")
-    reviews_key = "reviews"
-
-    def _star_to_int(v: Any) -> Optional[int]:
-        if v is None:
-            return None
-        if isinstance(v, (int, float)):
-            try:
-                return int(v)
-            except Exception:
-                return None
-        if isinstance(v, str):
-            mapping = {
-                "ONE": 1,
-                "TWO": 2,
-                "THREE": 3,
-                "FOUR": 4,
-                "FIVE": 5,
-                "1": 1,
-                "2": 2,
-                "3": 3,
-                "4": 4,
-                "5": 5,
-            }
-            return mapping.get(v.upper())
-        return None
+async def aupsert_reviews_from_normalized(db: AsyncSession, items: list[dict]) -> dict:
+    """Async variant of ``upsert_reviews_from_normalized`` for an AsyncSession.
 
-    containers = []
-    if isinstance(data, dict):
-        for ck in container_keys:
-            val = data.get(ck)
-            if isinstance(val, list):
-                containers = val
-                break
-        if not containers and isinstance(data.get(reviews_key), list):
-            # Top-level 'reviews'
-            containers = [{"locationName": "", "reviews": data.get(reviews_key)}]
-    elif isinstance(data, list):
-        containers = data
-
-    for container in containers or []:
-        if not isinstance(container, dict):
-            continue
-        location_name = container.get("locationName") or ""
-        for r in (container.get(reviews_key) or []):
-            if not isinstance(r, dict):
-                continue
-            rid = r.get("reviewId") or r.get("name")
-            # Derive a stable integer id and namespace Google ids as negative to avoid conflicts
-            rid_int: Optional[int] = None
-            if isinstance(rid, int):
-                rid_int = -abs(rid)
-            elif isinstance(rid, str):
-                tail = rid.split("/")[-1]
-                try:
-                    rid_int = -abs(int(tail))
-                except Exception:
-                    rid_int = -abs(int(zlib.crc32(rid.encode("utf-8"))))
-            else:
-                continue
-
-            rating_int = _star_to_int(r.get("starRating") or r.get("rating"))
-            reviewer = r.get("reviewer") or {}
-            items.append(
-                {
-                    "id": rid_int,
-                    "type": "guest-to-host",
-                    "status": "published",
-                    "rating": rating_int,
-                    "publicReview": r.get("comment") or r.get("text") or "",
-                    "submittedAt": r.get("createTime") or r.get("updateTime") or "",
-                    "guestName": reviewer.get("displayName") or "Google User",
-                    "listingName": location_name,
-                    "channel": "Google",
-                    "hidden": False,
-                    "reviewCategory": [],
-                }
-            )
-    return items
\ No newline at end of file
+    Runs the same set-based upsert; its statements await the async driver
+    instead of blocking a thread.
+    """
+    return await db.run_sync(upsert_reviews_from_normalized, items)
@@ -0,0 +1,83 @@
+import asyncio
+import gzip
+import os
+import zlib
+from typing import AsyncIterator, Optional
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional; gzip is always available
+    brotli = None
+
+# Responses smaller than this are sent uncompressed
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "5"))
+# Bodies above this are compressed off the event loop
+THREAD_MIN_BYTES = 128 * 1024
+
+
+def _accepted(accept_encoding: str) -> dict[str, float]:
+    accepted: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            accepted[name.strip().lower()] = q
+    return accepted
+
+
+def negotiate(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick "br" or "gzip" from an Accept-Encoding header, or None for identity."""
+    if not accept_encoding:
+        return None
+    accepted = _accepted(accept_encoding)
+    candidates = (("br",) if brotli is not None else ()) + ("gzip",)
+    best, best_q = None, 0.0
+    for encoding in candidates:
+        q = accepted.get(encoding, accepted.get("*", 0.0))
+        # Ties keep the earlier (preferred) encoding
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    # mtime=0 keeps the output deterministic, so cached bodies match their ETag
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+async def compress_body(body: bytes, encoding: Optional[str]) -> tuple[bytes, Optional[str]]:
+    """Compress ``body`` if it is large enough; returns the bytes and the encoding used."""
+    if encoding is None or len(body) < COMPRESSION_MIN_BYTES:
+        return body, None
+    if len(body) >= THREAD_MIN_BYTES:
+        return await asyncio.to_thread(compress, body, encoding), encoding
+    return compress(body, encoding), encoding
+
+
+async def compress_stream(chunks: AsyncIterator[bytes], encoding: Optional[str]) -> AsyncIterator[bytes]:
+    """Incrementally compress a chunked body (identity when ``encoding`` is None)."""
+    if encoding is None:
+        async for chunk in chunks:
+            yield chunk
+        return
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        process, finish = compressor.process, compressor.finish
+    else:
+        compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        process, finish = compressor.compress, compressor.flush
+    async for chunk in chunks:
+        out = process(chunk)
+        if out:
+            yield out
+    yield finish()
@@ -0,0 +1,94 @@
+import os
+import time
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import Response
+from sqlalchemy import Update, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.sql_models import DataVersion
+from app.response_cache import reviews_cache
+
+# How long a worker trusts its copy of the data version before re-reading it.
+# Bounds how late a worker notices writes made by another worker.
+DATA_VERSION_REFRESH_SECONDS = float(os.getenv("DATA_VERSION_REFRESH_SECONDS", "1"))
+DATA_VERSION_ID = 1
+
+_version: Optional[int] = None
+_modified_at: Optional[datetime] = None
+_checked_at = 0.0
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def bump_statement() -> Update:
+    """UPDATE that advances the data version; execute it before committing a review write."""
+    return (
+        update(DataVersion)
+        .where(DataVersion.id == DATA_VERSION_ID)
+        .values(version=DataVersion.version + 1, modified_at=_utcnow())
+    )
+
+
+def mark_changed() -> None:
+    """Call after committing a bump so this worker re-reads the version on the next request."""
+    global _checked_at
+    _checked_at = 0.0
+    reviews_cache.invalidate()
+
+
+async def current(db: AsyncSession) -> tuple[int, datetime]:
+    """Return (version, modified_at), from memory unless the refresh interval has passed."""
+    global _version, _modified_at, _checked_at
+    now = time.monotonic()
+    if _version is not None and now - _checked_at < DATA_VERSION_REFRESH_SECONDS:
+        return _version, _modified_at
+    row = (
+        await db.execute(
+            select(DataVersion.version, DataVersion.modified_at).where(DataVersion.id == DATA_VERSION_ID)
+        )
+    ).one_or_none()
+    version, modified_at = row if row is not None else (0, datetime(1970, 1, 1))
+    if _version is not None and version != _version:
+        # Another worker wrote; cached bodies are from the old data
+        reviews_cache.invalidate()
+    _version, _modified_at, _checked_at = version, modified_at, now
+    return version, modified_at
+
+
+def validators(version: int, modified_at: datetime, variant: str, weak: bool = False) -> dict[str, str]:
+    """ETag for one representation (``variant`` names the query) plus Last-Modified.
+
+    Use ``weak`` when the bytes may differ for the same tag, e.g. when a
+    middleware compresses the body.
+    """
+    return {
+        "ETag": f'{"W/" if weak else ""}"{version}-{variant}"',
+        "Last-Modified": format_datetime(modified_at.replace(tzinfo=timezone.utc, microsecond=0), usegmt=True),
+    }
+
+
+def not_modified(headers: dict[str, str], if_none_match: Optional[str], if_modified_since: Optional[str]) -> Optional[Response]:
+    """Return a 304 when the request's validators match, else None."""
+    if if_none_match is not None:
+        # If-None-Match takes precedence over If-Modified-Since (RFC 9110)
+        tags = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+        if "*" in tags or headers["ETag"].removeprefix("W/") in tags:
+            return Response(status_code=304, headers=headers)
+        return None
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return None
+        if since is None:
+            return None
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        if since >= parsedate_to_datetime(headers["Last-Modified"]):
+            return Response(status_code=304, headers=headers)
+    return None
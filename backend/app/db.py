@@ -1,26 +1,191 @@
-from sqlalchemy import create_engine
+import os
+import tempfile
+import zlib
+from contextlib import contextmanager
+from sqlalchemy import Engine, create_engine, event, make_url, text
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
-from .config import get_database_url
+from . import config
+from .config import get_database_read_url, get_database_url
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock
+    fcntl = None
 
 DATABASE_URL = get_database_url()
+DATABASE_READ_URL = get_database_read_url()
+
+
+def _sqlite_pragmas(dbapi_conn, _record, read_only: bool = False) -> None:
+    cursor = dbapi_conn.cursor()
+    try:
+        if not read_only:
+            # WAL lets dashboard reads proceed while a sync is writing (persists in the file)
+            cursor.execute(f"PRAGMA journal_mode={config.SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous={config.SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA busy_timeout={config.SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute(f"PRAGMA mmap_size={config.SQLITE_MMAP_SIZE}")
+        cursor.execute(f"PRAGMA cache_size={config.SQLITE_CACHE_SIZE}")
+    finally:
+        cursor.close()
+
+
+def _sqlite_read_only_pragmas(dbapi_conn, record) -> None:
+    _sqlite_pragmas(dbapi_conn, record, read_only=True)
+
+
+def _sqlite_read_only_url(url: str) -> str:
+    # Open the file through a URI so SQLite enforces mode=ro on the connection
+    parsed = make_url(url)
+    return f"{parsed.drivername}:///file:{os.path.abspath(parsed.database)}?mode=ro&uri=true"
+
+
+def _is_sqlite_file(url: str) -> bool:
+    return url.startswith("sqlite") and make_url(url).database not in (None, "", ":memory:")
+
+
+def _postgres_settings(read_only: bool = False) -> dict[str, str]:
+    settings = {}
+    if read_only:
+        settings["default_transaction_read_only"] = "on"
+    if config.DB_STATEMENT_TIMEOUT_MS:
+        settings["statement_timeout"] = str(config.DB_STATEMENT_TIMEOUT_MS)
+    if config.DB_LOCK_TIMEOUT_MS:
+        settings["lock_timeout"] = str(config.DB_LOCK_TIMEOUT_MS)
+    return settings
+
+
+def _engine_options(url: str, read_only: bool, is_async: bool) -> tuple[str, dict]:
+    # Returns the (possibly rewritten) URL and create_engine keyword arguments
+    if url.startswith("sqlite"):
+        if read_only and _is_sqlite_file(url) and "mode=ro" not in url:
+            url = _sqlite_read_only_url(url)
+        # SQLite requires special connect args; the driver timeout matches busy_timeout
+        connect_args = {"check_same_thread": False, "timeout": config.SQLITE_BUSY_TIMEOUT_MS / 1000}
+        return url, {"connect_args": connect_args}
+
+    connect_args: dict = {}
+    if url.startswith("postgres"):
+        settings = _postgres_settings(read_only)
+        if settings and is_async:
+            connect_args["server_settings"] = settings
+        elif settings:
+            connect_args["options"] = " ".join(f"-c {k}={v}" for k, v in settings.items())
+    return url, {
+        "connect_args": connect_args,
+        "pool_size": config.DB_POOL_SIZE,
+        "max_overflow": config.DB_MAX_OVERFLOW,
+        "pool_timeout": config.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": config.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": config.DB_POOL_PRE_PING,
+    }
+
+
+def _listen_sqlite_pragmas(sync_engine: Engine, read_only: bool) -> None:
+    if sync_engine.dialect.name == "sqlite":
+        event.listen(sync_engine, "connect", _sqlite_read_only_pragmas if read_only else _sqlite_pragmas)
+
 
-# SQLite requires special connect args
-connect_args = {"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
+def build_engine(url: str, read_only: bool = False) -> Engine:
+    """Create an engine with the tuning profile for its backend.
 
-engine = create_engine(DATABASE_URL, echo=False, future=True, connect_args=connect_args)
+    ``read_only`` engines reject writes: SQLite files are opened with
+    ``mode=ro`` and Postgres sessions default to read-only transactions.
+    """
+    url, options = _engine_options(url, read_only, is_async=False)
+    new_engine = create_engine(url, echo=False, future=True, **options)
+    _listen_sqlite_pragmas(new_engine, read_only)
+    return new_engine
+
+
+def _async_url(url: str) -> str:
+    parsed = make_url(url)
+    backend = parsed.drivername.split("+")[0]
+    if backend == "sqlite":
+        parsed = parsed.set(drivername="sqlite+aiosqlite")
+    elif backend in ("postgres", "postgresql"):
+        parsed = parsed.set(drivername="postgresql+asyncpg")
+    return parsed.render_as_string(hide_password=False)
+
+
+def build_async_engine(url: str, read_only: bool = False) -> AsyncEngine:
+    """Async counterpart of ``build_engine`` (aiosqlite / asyncpg), same profile."""
+    url, options = _engine_options(_async_url(url), read_only, is_async=True)
+    new_engine = create_async_engine(url, echo=False, **options)
+    _listen_sqlite_pragmas(new_engine.sync_engine, read_only)
+    return new_engine
+
+
+def _read_url() -> str | None:
+    if DATABASE_READ_URL:
+        return DATABASE_READ_URL
+    if _is_sqlite_file(DATABASE_URL):
+        # Same file, separate pool of read-only connections
+        return DATABASE_URL
+    # In-memory SQLite can't be shared; Postgres without a replica reads from the primary
+    return None
+
+
+_READ_URL = _read_url()
+
+# Sync engine for seed, migrations and sync lease bookkeeping
+engine = build_engine(DATABASE_URL)
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+
+# Async engines for the request path, so DB waits don't hold threadpool workers.
+# Objects stay usable after commit; async sessions can't lazy-load expired attributes.
+async_engine = build_async_engine(DATABASE_URL)
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+# Reads that tolerate replica lag (public list, metrics) use the read engine
+async_read_engine = build_async_engine(_READ_URL, read_only=True) if _READ_URL else async_engine
+AsyncReadSessionLocal = async_sessionmaker(bind=async_read_engine, autoflush=False, expire_on_commit=False)
 Base = declarative_base()
 
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
-def init_db():
-    # Import models so that metadata is populated
-    from .models.sql_models import Review, ReviewCategory  # noqa: F401
-    Base.metadata.create_all(bind=engine)
+async def get_async_read_db():
+    async with AsyncReadSessionLocal() as db:
+        yield db
+
+
+@contextmanager
+def startup_lock(name: str = "startup"):
+    """Hold a cross-process lock so only one worker runs startup work at a time.
+
+    Uses a Postgres advisory lock, or an flock next to the SQLite file.
+    """
+    if engine.dialect.name == "postgresql":
+        key = zlib.crc32(f"theflex:{name}".encode("utf-8"))
+        with engine.connect() as conn:
+            conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": key})
+            conn.commit()
+            try:
+                yield
+            finally:
+                conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": key})
+                conn.commit()
+        return
+
+    database = engine.url.database
+    if database and database != ":memory:":
+        lock_path = f"{os.path.abspath(database)}.{name}.lock"
+    else:
+        lock_path = os.path.join(tempfile.gettempdir(), f"theflex.{name}.lock")
+    try:
+        fh = open(lock_path, "a") if fcntl is not None else None
+    except OSError:
+        fh = None
+    if fh is None:
+        yield
+        return
+    with fh:
+        fcntl.flock(fh, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fh, fcntl.LOCK_UN)
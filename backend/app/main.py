@@ -1,11 +1,44 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from app.api import reviews
-from app.db import init_db, SessionLocal, engine
-from app.seed import seed_from_json, sync_all_from_json
+from app.compression import COMPRESSION_MIN_BYTES, GZIP_LEVEL
+from app.db import SessionLocal, startup_lock
+from app.migrations import SchemaOutOfDateError, check_schema_version, upgrade
+from app.seed import sync_seed_if_changed
+from app.http_client import close_http_client, start_http_client
+from app.sync import SYNC_ENABLED, SYNC_SHUTDOWN_GRACE_SECONDS, providers_configured, run_scheduler
+from contextlib import asynccontextmanager
+import asyncio
 import os
 
-app = FastAPI()
+# Convenience for local dev; deployments run migrations before starting the app
+MIGRATE_ON_STARTUP = os.getenv("MIGRATE_ON_STARTUP", "false").lower() in ("1", "true", "yes")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    on_startup()
+    await start_http_client()
+    # Provider sync runs off the request path; skip entirely when nothing is configured
+    sync_stop = asyncio.Event()
+    sync_task = None
+    if SYNC_ENABLED and providers_configured():
+        sync_task = asyncio.create_task(run_scheduler(sync_stop))
+    try:
+        yield
+    finally:
+        sync_stop.set()
+        if sync_task is not None:
+            # Let an in-flight run finish briefly, then cancel it so the worker exits promptly
+            try:
+                await asyncio.wait_for(sync_task, SYNC_SHUTDOWN_GRACE_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+        await close_http_client()
+
+
+app = FastAPI(lifespan=lifespan)
 
 # Enable CORS for frontend
 app.add_middleware(
@@ -16,29 +49,28 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress other large JSON responses; the reviews list negotiates its own encoding
+app.add_middleware(GZipMiddleware, minimum_size=COMPRESSION_MIN_BYTES, compresslevel=GZIP_LEVEL)
+
 # Routers
 app.include_router(reviews.router)
 
 
-@app.on_event("startup")
 def on_startup():
-    # Create tables
-    init_db()
-    # Lightweight migration: add 'channel' column if it doesn't exist yet
+    # Every uvicorn worker runs this; one does the work while the rest wait, then find it done
+    with startup_lock():
+        _prepare_database()
+
+
+def _prepare_database():
+    # Schema changes run out of band (python -m app.migrations upgrade); this is one query
     try:
-        # Ensure DDL is committed (SQLAlchemy 2.0 uses transactional DDL)
-        with engine.begin() as conn:
-            # SQLite-only check for existing columns
-            rows = conn.exec_driver_sql("PRAGMA table_info(reviews)").fetchall()
-            cols = {r[1] for r in rows}
-            if "channel" not in cols:
-                conn.exec_driver_sql("ALTER TABLE reviews ADD COLUMN channel VARCHAR(50)")
-    except Exception:
-        # Non-fatal; continue startup even if migration step fails
-        pass
-    # Seed once if empty
+        check_schema_version()
+    except SchemaOutOfDateError:
+        if not MIGRATE_ON_STARTUP:
+            raise
+        upgrade()
+    # Seed once if empty; re-sync from the mock JSON only when the file changed
     json_path = os.path.join(os.path.dirname(__file__), "mock_reviews.json")
     with SessionLocal() as db:
-        seed_from_json(db, json_path)
-        # Fully synchronize DB rows and categories with mock JSON while preserving 'hidden'
-        sync_all_from_json(db, json_path)
+        sync_seed_if_changed(db, json_path)
@@ -0,0 +1,269 @@
+import math
+import re
+from collections import Counter
+from datetime import datetime
+from typing import Any, Iterable, Optional
+
+from sqlalchemy import inspect, select, tuple_
+from sqlalchemy.orm import Session, load_only
+
+from app.models.sql_models import ListingMetrics, Review, ReviewRollup
+
+# Category ratings at or below this count as an issue (matches the dashboard)
+ISSUE_THRESHOLD = 6
+TOP_ISSUES = 3
+# Aggregate keys per SELECT ... IN (...); three bound parameters each for rollups
+_KEY_CHUNK_SIZE = 300
+
+
+def slugify(value: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", (value or "").lower()).strip("-")
+
+
+def month_key(value: Optional[datetime]) -> str:
+    # Rollup bucket; rows without a parsed timestamp land in the epoch month like their sort key
+    return value.strftime("%Y-%m") if value is not None else "1970-01"
+
+
+def previous_months(until: str, count: int) -> list[str]:
+    """``count`` "YYYY-MM" keys ending at ``until``, oldest first."""
+    year, month = (int(part) for part in until.split("-"))
+    index = year * 12 + month - 1
+    return [f"{i // 12:04d}-{i % 12 + 1:02d}" for i in range(index - count + 1, index + 1)]
+
+
+def round_score(value: float) -> float:
+    # Round half up like the frontend's Math.round(x * 10) / 10
+    return math.floor(value * 10 + 0.5) / 10
+
+
+def category_average(ratings: Iterable[int], fallback: Optional[int] = None) -> Optional[float]:
+    """Mean category rating rounded to 1 dp, or ``fallback`` when there are none."""
+    vals = [r for r in ratings if isinstance(r, (int, float))]
+    if not vals:
+        return fallback
+    return round_score(sum(vals) / len(vals))
+
+
+def _contribution(review: Review | dict) -> dict[str, Any]:
+    # Accepts an ORM row or a plain dict with the same keys (reviewCategory as dicts)
+    if isinstance(review, dict):
+        get = review.get
+        categories = [(c["category"], c["rating"]) for c in review.get("reviewCategory") or []]
+    else:
+        get = lambda key: getattr(review, key)  # noqa: E731
+        categories = [(c.category, c.rating) for c in review.reviewCategory or []]
+    return {
+        "listing": get("listingName") or "",
+        "visible": 0 if get("hidden") else 1,
+        "score": category_average([r for _, r in categories], get("rating")),
+        "channel": get("channel") or "Direct",
+        "type": get("type"),
+        "month": month_key(get("submittedAtUtc")),
+        "categories": categories,
+        "issues": [cat for cat, r in categories if r <= ISSUE_THRESHOLD],
+    }
+
+
+class MetricsDelta:
+    """Accumulates listing_metrics and review_rollups changes from a batch of review writes.
+
+    Call ``remove`` with a row's state before it is modified and ``add`` with
+    its state afterwards, then ``apply`` once before committing so each
+    touched aggregate row is written a single time.
+    """
+
+    def __init__(self) -> None:
+        self._deltas: dict[str, dict[str, Any]] = {}
+        self._rollups: dict[tuple[str, str, str], dict[str, Any]] = {}
+
+    def _delta(self, listing: str) -> dict[str, Any]:
+        if listing not in self._deltas:
+            self._deltas[listing] = {
+                "total": 0,
+                "visible": 0,
+                "score_sum": 0.0,
+                "score_count": 0,
+                "channels": Counter(),
+                "types": Counter(),
+                "issues": Counter(),
+            }
+        return self._deltas[listing]
+
+    def _rollup(self, c: dict[str, Any]) -> dict[str, Any]:
+        key = (c["listing"], c["channel"], c["month"])
+        if key not in self._rollups:
+            self._rollups[key] = {
+                "total": 0,
+                "visible": 0,
+                "score_sum": 0.0,
+                "score_count": 0,
+                "category_sums": Counter(),
+                "category_counts": Counter(),
+                "issues": Counter(),
+            }
+        return self._rollups[key]
+
+    def _record(self, review: Review | dict, sign: int) -> None:
+        c = _contribution(review)
+        d = self._delta(c["listing"])
+        r = self._rollup(c)
+        for agg in (d, r):
+            agg["total"] += sign
+            agg["visible"] += sign * c["visible"]
+            if c["score"] is not None:
+                agg["score_sum"] += sign * c["score"]
+                agg["score_count"] += sign
+            for cat in c["issues"]:
+                agg["issues"][cat] += sign
+        d["channels"][c["channel"]] += sign
+        d["types"][c["type"]] += sign
+        for cat, rating in c["categories"]:
+            r["category_sums"][cat] += sign * rating
+            r["category_counts"][cat] += sign
+
+    def add(self, review: Review | dict) -> None:
+        self._record(review, 1)
+
+    def remove(self, review: Review | dict) -> None:
+        self._record(review, -1)
+
+    def visibility(self, review: Review | dict, delta: int) -> None:
+        c = _contribution(review)
+        self._delta(c["listing"])["visible"] += delta
+        self._rollup(c)["visible"] += delta
+
+    def apply(self, db: Session) -> None:
+        _apply_aggregates(db, ListingMetrics, {(listing,): d for listing, d in self._deltas.items()})
+        _apply_aggregates(db, ReviewRollup, self._rollups)
+        self._deltas.clear()
+        self._rollups.clear()
+
+
+def _apply_aggregates(db: Session, model: type, deltas: dict[tuple, dict[str, Any]]) -> None:
+    # Numbers are added; Counters are merged into the matching JSON column
+    pk = list(model.__table__.primary_key.columns)
+    keys = list(deltas)
+    existing = {}
+    for start in range(0, len(keys), _KEY_CHUNK_SIZE):
+        chunk = keys[start : start + _KEY_CHUNK_SIZE]
+        match = pk[0].in_([k[0] for k in chunk]) if len(pk) == 1 else tuple_(*pk).in_(chunk)
+        for row in db.scalars(select(model).where(match).with_for_update()):
+            existing[tuple(getattr(row, c.key) for c in pk)] = row
+
+    for key, delta in deltas.items():
+        row = existing.get(key)
+        if row is None:
+            identity = {c.key: value for c, value in zip(pk, key)}
+            row = model(**identity, **{k: {} if isinstance(v, Counter) else type(v)() for k, v in delta.items()})
+            db.add(row)
+        for field, value in delta.items():
+            if isinstance(value, Counter):
+                # JSON columns are not mutation-tracked; assign fresh dicts
+                setattr(row, field, _merge(getattr(row, field), value))
+            else:
+                setattr(row, field, getattr(row, field) + value)
+        if row.total <= 0:
+            if inspect(row).pending:
+                db.expunge(row)
+            else:
+                db.delete(row)
+
+
+def _merge(current: Optional[dict], delta: Counter) -> dict:
+    merged = Counter(current or {})
+    merged.update(delta)
+    return {k: v for k, v in merged.items() if v > 0}
+
+
+def rebuild_aggregates(db: Session) -> int:
+    """Recompute every listing_metrics and review_rollups row from the reviews table.
+
+    Returns the number of listing_metrics rows.
+    """
+    db.query(ListingMetrics).delete()
+    db.query(ReviewRollup).delete()
+    delta = MetricsDelta()
+    # Only what _contribution reads, so this also runs mid-migration before later columns exist
+    fields = load_only(
+        Review.listingName, Review.hidden, Review.rating, Review.channel, Review.type, Review.submittedAtUtc
+    )
+    for review in db.query(Review).options(fields).yield_per(500):
+        delta.add(review)
+    delta.apply(db)
+    db.commit()
+    return db.query(ListingMetrics).count()
+
+
+def serialize_listing_metrics(row: ListingMetrics) -> dict[str, Any]:
+    avg = None
+    if row.score_count:
+        avg = round_score(row.score_sum / row.score_count)
+    top_issues = sorted((row.issues or {}).items(), key=lambda kv: kv[1], reverse=True)[:TOP_ISSUES]
+    return {
+        "slug": slugify(row.listingName) or "unknown",
+        "name": row.listingName or "Unknown",
+        "total": row.total,
+        "visible": row.visible,
+        "avg": avg,
+        "channels": row.channels or {},
+        "types": row.types or {},
+        "topIssues": [{"category": k, "count": v} for k, v in top_issues],
+    }
+
+
+def serialize_trends(rows: Iterable[ReviewRollup], months: list[str]) -> list[dict[str, Any]]:
+    """Per-listing monthly series over ``months`` (zero-filled), summed across channels."""
+    by_listing: dict[str, dict[str, dict[str, Any]]] = {}
+    for row in rows:
+        series = by_listing.setdefault(row.listingName, {})
+        point = series.setdefault(
+            row.month,
+            {
+                "total": 0,
+                "visible": 0,
+                "score_sum": 0.0,
+                "score_count": 0,
+                "category_sums": Counter(),
+                "category_counts": Counter(),
+                "issues": Counter(),
+            },
+        )
+        point["total"] += row.total
+        point["visible"] += row.visible
+        point["score_sum"] += row.score_sum
+        point["score_count"] += row.score_count
+        point["category_sums"].update(row.category_sums or {})
+        point["category_counts"].update(row.category_counts or {})
+        point["issues"].update(row.issues or {})
+
+    result = []
+    for listing, series in by_listing.items():
+        points = []
+        for month in months:
+            p = series.get(month)
+            if p is None:
+                points.append({"month": month, "total": 0, "visible": 0, "avg": None, "categories": {}, "issues": {}})
+                continue
+            counts = p["category_counts"]
+            points.append(
+                {
+                    "month": month,
+                    "total": p["total"],
+                    "visible": p["visible"],
+                    "avg": round_score(p["score_sum"] / p["score_count"]) if p["score_count"] else None,
+                    "categories": {
+                        cat: round_score(p["category_sums"][cat] / n) for cat, n in sorted(counts.items()) if n > 0
+                    },
+                    "issues": dict(sorted(p["issues"].items())),
+                }
+            )
+        result.append(
+            {
+                "slug": slugify(listing) or "unknown",
+                "name": listing or "Unknown",
+                "total": sum(p["total"] for p in points),
+                "months": points,
+            }
+        )
+    return sorted(result, key=lambda r: (-r["total"], r["name"]))
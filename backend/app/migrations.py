@@ -0,0 +1,234 @@
+"""Versioned schema migrations.
+
+Run out of band before starting the app::
+
+    python -m app.migrations upgrade   # apply pending migrations
+    python -m app.migrations current   # print the database's schema version
+
+Each migration runs once, in its own transaction, and records its version in
+app_metadata. Migrations are written to be safe on databases created before
+versioning existed (they inspect before altering), so an unversioned database
+is brought up to date by running them all.
+"""
+import argparse
+import logging
+import sys
+from datetime import datetime, timezone
+from typing import Callable
+
+from sqlalchemy import Column, Connection, Engine, bindparam, insert, inspect, select, text, update
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateIndex
+from sqlalchemy.sql.visitors import iterate
+
+from app.db import Base, engine, startup_lock
+from app.metrics import category_average
+from app.models.sql_models import AppMetadata, DataVersion, ListingMetrics, Review, ReviewCategory, ReviewRollup
+from app.timestamps import parse_timestamp
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION_KEY = "schema_version"
+
+
+class SchemaOutOfDateError(RuntimeError):
+    pass
+
+
+def _columns(conn: Connection, table: str) -> set[str]:
+    return {c["name"] for c in inspect(conn).get_columns(table)}
+
+
+def _add_column(conn: Connection, model, name: str) -> None:
+    # Add a model column to an existing table using its declared type
+    if name in _columns(conn, model.__tablename__):
+        return
+    column = model.__table__.c[name]
+    preparer = conn.dialect.identifier_preparer
+    conn.exec_driver_sql(
+        f"ALTER TABLE {preparer.quote(model.__tablename__)} "
+        f"ADD COLUMN {preparer.quote(name)} {column.type.compile(dialect=conn.dialect)}"
+    )
+
+
+def _create_indexes(conn: Connection, *models) -> None:
+    # Indexes on columns a later migration adds are left for that migration
+    for model in models:
+        existing = _columns(conn, model.__tablename__)
+        for index in model.__table__.indexes:
+            referenced = {c.name for expr in index.expressions for c in iterate(expr) if isinstance(c, Column)}
+            if referenced <= existing:
+                # IF NOT EXISTS rather than checkfirst, which can't reflect expression indexes
+                conn.execute(CreateIndex(index, if_not_exists=True))
+
+
+def _0001_create_tables(conn: Connection) -> None:
+    Base.metadata.create_all(bind=conn)
+
+
+def _0002_review_channel(conn: Connection) -> None:
+    _add_column(conn, Review, "channel")
+
+
+def _0003_review_content_hash(conn: Connection) -> None:
+    _add_column(conn, Review, "contentHash")
+
+
+def _backfill_submitted_at_utc(conn: Connection) -> None:
+    # Fill submittedAtUtc for rows written before the column existed
+    table = Review.__table__
+    rows = conn.execute(select(table.c.id, table.c.submittedAt).where(table.c.submittedAtUtc.is_(None))).all()
+    if rows:
+        conn.execute(
+            update(table).where(table.c.id == bindparam("rid")).values(submittedAtUtc=bindparam("ts")),
+            [{"rid": rid, "ts": parse_timestamp(submitted)} for rid, submitted in rows],
+        )
+
+
+def _0004_review_submitted_at_utc(conn: Connection) -> None:
+    _add_column(conn, Review, "submittedAtUtc")
+    _backfill_submitted_at_utc(conn)
+
+
+def _0005_review_indexes(conn: Connection) -> None:
+    # Superseded by the submittedAtUtc indexes
+    for name in ("hidden", "listing", "channel", "type"):
+        conn.exec_driver_sql(f"DROP INDEX IF EXISTS ix_reviews_{name}_submitted")
+    _create_indexes(conn, Review, ReviewCategory)
+
+
+def _0006_listing_metrics_backfill(conn: Connection) -> None:
+    from app.metrics import rebuild_aggregates
+
+    with Session(bind=conn) as db:
+        if not db.query(ListingMetrics).first() and db.query(Review.id).first():
+            rebuild_aggregates(db)
+
+
+def _0007_data_version(conn: Connection) -> None:
+    DataVersion.__table__.create(bind=conn, checkfirst=True)
+    if conn.execute(select(DataVersion.id).where(DataVersion.id == 1)).first() is None:
+        conn.execute(insert(DataVersion).values(id=1, version=1, modified_at=datetime.now(timezone.utc).replace(tzinfo=None)))
+
+
+def _0008_search_index(conn: Connection) -> None:
+    from app.search import create_search_index
+
+    create_search_index(conn)
+
+
+def _backfill_category_average(conn: Connection) -> None:
+    # Compute categoryAverage for every review from its stored categories
+    table = Review.__table__
+    ratings: dict[int, list[int]] = {}
+    for rid, rating in conn.execute(select(ReviewCategory.review_id, ReviewCategory.rating)):
+        ratings.setdefault(rid, []).append(rating)
+    rows = conn.execute(select(table.c.id, table.c.rating)).all()
+    if rows:
+        conn.execute(
+            update(table).where(table.c.id == bindparam("rid")).values(categoryAverage=bindparam("avg")),
+            [{"rid": rid, "avg": category_average(ratings.get(rid, []), rating)} for rid, rating in rows],
+        )
+
+
+def _0009_review_category_average(conn: Connection) -> None:
+    _add_column(conn, Review, "categoryAverage")
+    _backfill_category_average(conn)
+    _create_indexes(conn, Review)
+
+
+def _0010_review_rollups(conn: Connection) -> None:
+    from app.metrics import rebuild_aggregates
+
+    ReviewRollup.__table__.create(bind=conn, checkfirst=True)
+    _create_indexes(conn, ReviewRollup)
+    with Session(bind=conn) as db:
+        if not db.query(ReviewRollup).first() and db.query(Review.id).first():
+            rebuild_aggregates(db)
+
+
+MIGRATIONS: list[tuple[int, str, Callable[[Connection], None]]] = [
+    (1, "create tables", _0001_create_tables),
+    (2, "reviews.channel", _0002_review_channel),
+    (3, "reviews.contentHash", _0003_review_content_hash),
+    (4, "reviews.submittedAtUtc + backfill", _0004_review_submitted_at_utc),
+    (5, "reviews/review_categories indexes", _0005_review_indexes),
+    (6, "listing_metrics backfill", _0006_listing_metrics_backfill),
+    (7, "data_version", _0007_data_version),
+    (8, "full-text search index", _0008_search_index),
+    (9, "reviews.categoryAverage + backfill + score indexes", _0009_review_category_average),
+    (10, "review_rollups + backfill", _0010_review_rollups),
+]
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def current_version(bind: Engine | Connection) -> int:
+    """Return the recorded schema version (0 if unversioned). One query."""
+    try:
+        if isinstance(bind, Engine):
+            with bind.connect() as conn:
+                return current_version(conn)
+        value = bind.execute(
+            select(AppMetadata.value).where(AppMetadata.key == SCHEMA_VERSION_KEY)
+        ).scalar()
+        return int(value) if value is not None else 0
+    except Exception:
+        # app_metadata doesn't exist yet
+        if isinstance(bind, Connection) and bind.in_transaction():
+            bind.rollback()
+        return 0
+
+
+def _set_version(conn: Connection, version: int) -> None:
+    updated = conn.execute(
+        text("UPDATE app_metadata SET value = :v WHERE key = :k"),
+        {"v": str(version), "k": SCHEMA_VERSION_KEY},
+    )
+    if updated.rowcount == 0:
+        conn.execute(
+            text("INSERT INTO app_metadata (key, value) VALUES (:k, :v)"),
+            {"v": str(version), "k": SCHEMA_VERSION_KEY},
+        )
+
+
+def upgrade(bind: Engine = engine) -> list[int]:
+    """Apply pending migrations in order; returns the versions applied."""
+    applied: list[int] = []
+    with startup_lock("migrate"):
+        version = current_version(bind)
+        for number, description, migrate in MIGRATIONS:
+            if number <= version:
+                continue
+            logger.info("Applying migration %04d: %s", number, description)
+            with bind.begin() as conn:
+                migrate(conn)
+                _set_version(conn, number)
+            applied.append(number)
+    return applied
+
+
+def check_schema_version(bind: Engine = engine) -> None:
+    version = current_version(bind)
+    if version < LATEST_VERSION:
+        raise SchemaOutOfDateError(
+            f"Database schema is at version {version}, expected {LATEST_VERSION}. "
+            "Run `python -m app.migrations upgrade` first."
+        )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.migrations", description="Manage the database schema.")
+    parser.add_argument("command", choices=("upgrade", "current"), nargs="?", default="upgrade")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    if args.command == "current":
+        print(f"{current_version(engine)} (latest {LATEST_VERSION})")
+        return 0
+    applied = upgrade(engine)
+    print(f"Applied {len(applied)} migration(s); schema at version {current_version(engine)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
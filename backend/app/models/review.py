@@ -1,5 +1,5 @@
-from pydantic import BaseModel, ConfigDict
-from typing import Optional, List
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Dict, Literal, Optional, List
 
 
 class ReviewCategory(BaseModel):
@@ -22,8 +22,89 @@ class Review(BaseModel):
     listingName: str
     channel: Optional[str] = None
     hidden: bool = False
+    # Mean category rating rounded to 1 dp, or rating when there are no categories
+    categoryAverage: Optional[float] = None
     reviewCategory: List[ReviewCategory]
     
 class ReviewResponse(BaseModel):
     status: str
     result: List[Review]
+    # Set when the list was paginated with `limit` and more rows follow
+    nextCursor: Optional[str] = None
+
+
+class ModeratedReview(Review):
+    # Omitted from hide/show responses unless include_categories=true
+    reviewCategory: Optional[List[ReviewCategory]] = None
+
+
+class ReviewSearchResult(Review):
+    # Matching text with hits wrapped in <mark>; everything else is HTML-escaped
+    snippet: Optional[str] = None
+
+
+class ReviewSearchResponse(BaseModel):
+    status: str
+    result: List[ReviewSearchResult]
+    nextCursor: Optional[str] = None
+
+
+class VisibilityUpdate(BaseModel):
+    # At most one id chunk, so the batch is a single UPDATE
+    ids: List[int] = Field(min_length=1, max_length=500)
+    hidden: bool
+
+
+class VisibilityResult(BaseModel):
+    id: int
+    result: Literal["updated", "unchanged", "not_found"]
+
+
+class VisibilityResponse(BaseModel):
+    status: str
+    updated: int
+    result: List[VisibilityResult]
+
+
+class IssueCount(BaseModel):
+    category: str
+    count: int
+
+
+class ListingMetrics(BaseModel):
+    slug: str
+    name: str
+    total: int
+    visible: int
+    avg: Optional[float]
+    channels: Dict[str, int]
+    types: Dict[str, int]
+    topIssues: List[IssueCount]
+
+
+class ListingMetricsResponse(BaseModel):
+    status: str
+    result: List[ListingMetrics]
+
+
+class TrendPoint(BaseModel):
+    month: str
+    total: int
+    visible: int
+    avg: Optional[float]
+    # Mean rating per category that month
+    categories: Dict[str, float]
+    issues: Dict[str, int]
+
+
+class ListingTrend(BaseModel):
+    slug: str
+    name: str
+    total: int
+    months: List[TrendPoint]
+
+
+class TrendsResponse(BaseModel):
+    status: str
+    months: List[str]
+    result: List[ListingTrend]
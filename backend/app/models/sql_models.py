@@ -1,4 +1,5 @@
-from sqlalchemy import Integer, String, Boolean, ForeignKey
+from datetime import datetime
+from sqlalchemy import Integer, String, Boolean, ForeignKey, DateTime, Index, Float, JSON, func, literal_column
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from ..db import Base
 
@@ -11,19 +12,42 @@ class Review(Base):
     status: Mapped[str] = mapped_column(String(50), nullable=False)
     rating: Mapped[int | None] = mapped_column(Integer, nullable=True)
     publicReview: Mapped[str] = mapped_column(String, nullable=False)
+    # Original provider string, returned as-is by the API
     submittedAt: Mapped[str] = mapped_column(String(32), nullable=False)
+    # submittedAt parsed to naive UTC (epoch if unparseable); used for date filters and sorts
+    submittedAtUtc: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
     guestName: Mapped[str] = mapped_column(String(200), nullable=False)
     listingName: Mapped[str] = mapped_column(String(200), nullable=False)
     channel: Mapped[str | None] = mapped_column(String(50), nullable=True)
     hidden: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+    # sha256 of the provider-owned fields + sorted categories; lets sync skip unchanged rows
+    contentHash: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    # Mean category rating (1 dp, falling back to rating), computed on write; drives score filters and sorts
+    categoryAverage: Mapped[float | None] = mapped_column(Float, nullable=True)
 
     # Name this relationship to match Pydantic Review.reviewCategory
     reviewCategory: Mapped[list["ReviewCategory"]] = relationship(
         back_populates="review",
         cascade="all, delete-orphan",
         lazy="selectin",
+        # Insertion order, i.e. the order the provider listed them
+        order_by="ReviewCategory.id",
     )
 
+    # Keyset pagination on (submittedAtUtc, id), optionally narrowed by an equality filter
+    __table_args__ = (
+        Index("ix_reviews_submitted_utc", "submittedAtUtc", "id"),
+        Index("ix_reviews_hidden_submitted_utc", "hidden", "submittedAtUtc", "id"),
+        Index("ix_reviews_listing_submitted_utc", "listingName", "submittedAtUtc", "id"),
+        Index("ix_reviews_channel_submitted_utc", "channel", "submittedAtUtc", "id"),
+        Index("ix_reviews_type_submitted_utc", "type", "submittedAtUtc", "id"),
+    )
+
+
+# Score sorts treat a missing average as 0; queries must use the same expression to hit these
+Index("ix_reviews_score", func.coalesce(Review.categoryAverage, literal_column("0")), Review.id)
+Index("ix_reviews_hidden_score", Review.hidden, func.coalesce(Review.categoryAverage, literal_column("0")), Review.id)
+
 
 class ReviewCategory(Base):
     __tablename__ = "review_categories"
@@ -34,3 +58,78 @@ class ReviewCategory(Base):
     rating: Mapped[int] = mapped_column(Integer, nullable=False)
 
     review: Mapped[Review] = relationship(back_populates="reviewCategory")
+
+    __table_args__ = (
+        Index("ix_review_categories_review", "review_id", "rating"),
+        Index("ix_review_categories_category", "category", "review_id"),
+    )
+
+
+class ListingMetrics(Base):
+    __tablename__ = "listing_metrics"
+
+    # Materialized per-listing aggregates, maintained incrementally by app.metrics
+    listingName: Mapped[str] = mapped_column(String(200), primary_key=True)
+    total: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    visible: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # Sum/count of per-review category averages for reviews that have a score
+    score_sum: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    score_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    channels: Mapped[dict] = mapped_column(JSON, nullable=False, default=dict)
+    types: Mapped[dict] = mapped_column(JSON, nullable=False, default=dict)
+    # Count of category ratings at or below the issue threshold, per category
+    issues: Mapped[dict] = mapped_column(JSON, nullable=False, default=dict)
+
+
+class ReviewRollup(Base):
+    __tablename__ = "review_rollups"
+
+    # Materialized per (listing, channel, month) aggregates, maintained incrementally by app.metrics
+    listingName: Mapped[str] = mapped_column(String(200), primary_key=True)
+    channel: Mapped[str] = mapped_column(String(50), primary_key=True)
+    # "YYYY-MM" of submittedAtUtc
+    month: Mapped[str] = mapped_column(String(7), primary_key=True)
+    total: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    visible: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    score_sum: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    score_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # Per-category rating sum and count
+    category_sums: Mapped[dict] = mapped_column(JSON, nullable=False, default=dict)
+    category_counts: Mapped[dict] = mapped_column(JSON, nullable=False, default=dict)
+    # Count of category ratings at or below the issue threshold, per category
+    issues: Mapped[dict] = mapped_column(JSON, nullable=False, default=dict)
+
+    # Trend queries read a range of months across listings
+    __table_args__ = (Index("ix_review_rollups_month", "month"),)
+
+
+class SyncState(Base):
+    __tablename__ = "sync_state"
+
+    # "providers" holds the run lease; each provider's row holds its fetch watermark.
+    # Times are naive UTC
+    name: Mapped[str] = mapped_column(String(50), primary_key=True)
+    # Start time of the last run that completed successfully
+    watermark: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    last_attempt_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    last_error: Mapped[str | None] = mapped_column(String, nullable=True)
+    # Cross-worker single-flight lease; a run may start only once this has passed
+    lease_until: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
+
+class AppMetadata(Base):
+    __tablename__ = "app_metadata"
+
+    # Small key/value store for bookkeeping such as the seed file fingerprint
+    key: Mapped[str] = mapped_column(String(100), primary_key=True)
+    value: Mapped[str] = mapped_column(String, nullable=False)
+
+
+class DataVersion(Base):
+    __tablename__ = "data_version"
+
+    # Single row, bumped in the same transaction as every review write; drives ETags
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # Naive UTC
+    modified_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
@@ -0,0 +1,285 @@
+import asyncio
+import json
+import os
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from app.http_client import get_http_client
+from app.token_cache import TokenCache
+
+# GOOGLE REVIEWS API (GOOGLE BUSINESS PROFILE API)
+GOOGLE_BUSINESS_PROFILE_BASE_URL = os.getenv(
+    "GOOGLE_BUSINESS_PROFILE_BASE_URL", "https://mybusiness.googleapis.com/v4"
+).rstrip("/")
+GOOGLE_BUSINESS_PROFILE_ACCOUNT_ID = os.getenv("GOOGLE_BUSINESS_PROFILE_ACCOUNT_ID", "google")
+# Location listing moved out of v4 into the Business Information API
+GOOGLE_BUSINESS_INFORMATION_BASE_URL = os.getenv(
+    "GOOGLE_BUSINESS_INFORMATION_BASE_URL", "https://mybusinessbusinessinformation.googleapis.com/v1"
+).rstrip("/")
+GOOGLE_SERVICE_ACCOUNT_FILE = "service_account.json"
+GOOGLE_BUSINESS_PROFILE_API_SCOPES = ["https://www.googleapis.com/auth/business.manage"]
+GOOGLE_TIMEOUT_SECONDS = float(os.getenv("GOOGLE_TIMEOUT_SECONDS", "10"))
+# Optional fixed list of "accounts/x/locations/y" names; skips location discovery
+GOOGLE_BUSINESS_PROFILE_LOCATION_NAMES = [
+    n.strip() for n in os.getenv("GOOGLE_BUSINESS_PROFILE_LOCATION_NAMES", "").split(",") if n.strip()
+]
+GOOGLE_LOCATIONS_TTL_SECONDS = float(os.getenv("GOOGLE_LOCATIONS_TTL_SECONDS", "3600"))
+GOOGLE_LOCATIONS_PAGE_SIZE = 100
+# Locations per batchGetReviews call, reviews per page, and batches in flight
+GOOGLE_BATCH_SIZE = int(os.getenv("GOOGLE_BATCH_SIZE", "50"))
+GOOGLE_REVIEWS_PAGE_SIZE = 50
+GOOGLE_CONCURRENCY = int(os.getenv("GOOGLE_CONCURRENCY", "4"))
+
+google_token_cache = TokenCache("google")
+_google_credentials = None
+_google_credentials_lock = threading.Lock()
+_google_transport = None
+# account id -> (monotonic fetch time, {location name: title})
+_locations_cache: dict[str, tuple[float, dict[str, str]]] = {}
+
+
+def google_configured() -> bool:
+    # Only call Google if service account credentials are available (env JSON or file)
+    return bool(os.getenv("GOOGLE_SERVICE_ACCOUNT_JSON") or os.path.exists(GOOGLE_SERVICE_ACCOUNT_FILE))
+
+
+def _google_service_account_credentials():
+    # Parse the service-account key once per process; the RSA key object is reused for signing
+    global _google_credentials
+    if _google_credentials is None:
+        with _google_credentials_lock:
+            if _google_credentials is None:
+                from google.oauth2 import service_account
+
+                json_env = os.getenv("GOOGLE_SERVICE_ACCOUNT_JSON")
+                if json_env:
+                    info = json.loads(json_env)
+                    _google_credentials = service_account.Credentials.from_service_account_info(
+                        info, scopes=GOOGLE_BUSINESS_PROFILE_API_SCOPES
+                    )
+                else:
+                    _google_credentials = service_account.Credentials.from_service_account_file(
+                        GOOGLE_SERVICE_ACCOUNT_FILE, scopes=GOOGLE_BUSINESS_PROFILE_API_SCOPES
+                    )
+    return _google_credentials
+
+
+def _google_auth_transport():
+    # Pooled requests.Session so token exchanges reuse the TLS connection
+    global _google_transport
+    if _google_transport is None:
+        import google.auth.transport.requests
+        import requests
+
+        _google_transport = google.auth.transport.requests.Request(session=requests.Session())
+    return _google_transport
+
+
+def _mint_google_access_token() -> tuple[str, float] | None:
+    try:
+        credentials = _google_service_account_credentials()
+        with _google_credentials_lock:
+            credentials.refresh(_google_auth_transport())
+        if not credentials.token:
+            return None
+        expires_in = 0.0
+        if credentials.expiry:
+            # google-auth reports expiry as naive UTC
+            now = datetime.now(timezone.utc).replace(tzinfo=None)
+            expires_in = (credentials.expiry - now).total_seconds()
+        return credentials.token, expires_in
+    except Exception:
+        return None
+
+
+def get_google_service_account_access_token() -> Optional[str]:
+    # Only refreshes (JWT signing + token exchange) when the cached token nears expiry
+    return google_token_cache.get(_mint_google_access_token)
+
+
+def _account_url(suffix: str) -> str:
+    return f"{GOOGLE_BUSINESS_PROFILE_BASE_URL}/accounts/{GOOGLE_BUSINESS_PROFILE_ACCOUNT_ID}/{suffix}"
+
+
+def _v4_location_name(name: str) -> str:
+    # Business Information returns "locations/{id}"; batchGetReviews wants "accounts/{aid}/locations/{id}"
+    return f"accounts/{GOOGLE_BUSINESS_PROFILE_ACCOUNT_ID}/{name}"
+
+
+async def discover_google_locations(token: str) -> dict[str, str]:
+    """Return ``{v4 location resource name: title}`` for the account, cached per account."""
+    if GOOGLE_BUSINESS_PROFILE_LOCATION_NAMES:
+        return {name: "" for name in GOOGLE_BUSINESS_PROFILE_LOCATION_NAMES}
+    cached = _locations_cache.get(GOOGLE_BUSINESS_PROFILE_ACCOUNT_ID)
+    if cached and time.monotonic() - cached[0] < GOOGLE_LOCATIONS_TTL_SECONDS:
+        return cached[1]
+
+    client = get_http_client()
+    url = f"{GOOGLE_BUSINESS_INFORMATION_BASE_URL}/accounts/{GOOGLE_BUSINESS_PROFILE_ACCOUNT_ID}/locations"
+    locations: dict[str, str] = {}
+    page_token = None
+    while True:
+        params = {"readMask": "name,title", "pageSize": GOOGLE_LOCATIONS_PAGE_SIZE}
+        if page_token:
+            params["pageToken"] = page_token
+        resp = await client.get(
+            url,
+            params=params,
+            headers={"Authorization": f"Bearer {token}"},
+            timeout=GOOGLE_TIMEOUT_SECONDS,
+        )
+        resp.raise_for_status()
+        data = resp.json() or {}
+        for loc in data.get("locations") or []:
+            if isinstance(loc, dict) and loc.get("name"):
+                locations[_v4_location_name(loc["name"])] = loc.get("title") or ""
+        page_token = data.get("nextPageToken")
+        if not page_token:
+            break
+    _locations_cache[GOOGLE_BUSINESS_PROFILE_ACCOUNT_ID] = (time.monotonic(), locations)
+    return locations
+
+
+async def _batch_get_reviews(token: str, location_names: list[str], titles: dict[str, str]) -> list[dict]:
+    # Follow nextPageToken until this batch of locations is exhausted
+    client = get_http_client()
+    items: list[dict] = []
+    page_token = None
+    while True:
+        payload: dict[str, Any] = {
+            "locationNames": location_names,
+            "pageSize": GOOGLE_REVIEWS_PAGE_SIZE,
+            "ignoreRatingOnlyReviews": False,
+        }
+        if page_token:
+            payload["pageToken"] = page_token
+        resp = await client.post(
+            _account_url("locations:batchGetReviews"),
+            headers={"Authorization": f"Bearer {token}"},
+            json=payload,
+            timeout=GOOGLE_TIMEOUT_SECONDS,
+        )
+        resp.raise_for_status()  # raises if status != 2xx
+        data = resp.json()
+        items.extend(normalize_google_response(data, titles))
+        page_token = (data or {}).get("nextPageToken")
+        if not page_token:
+            return items
+
+
+async def get_google_business_profile_reviews():
+    # google-auth refreshes synchronously; keep it off the event loop
+    token = await asyncio.to_thread(get_google_service_account_access_token)
+    if not token:
+        return None
+
+    titles = await discover_google_locations(token)
+    names = list(titles)
+    if not names:
+        return []
+    batches = [names[i : i + GOOGLE_BATCH_SIZE] for i in range(0, len(names), GOOGLE_BATCH_SIZE)]
+    semaphore = asyncio.Semaphore(GOOGLE_CONCURRENCY)
+
+    async def fetch(batch: list[str]) -> list[dict]:
+        async with semaphore:
+            return await _batch_get_reviews(token, batch, titles)
+
+    items: list[dict] = []
+    for result in await asyncio.gather(*(fetch(b) for b in batches)):
+        items.extend(result)
+    return items
+
+
+def normalize_google_response(data: Any, titles: Optional[dict[str, str]] = None) -> list[dict]:
+    items: list[dict] = []
+    titles = titles or {}
+    if not data:
+        return items
+
+    # 'batchGetReviews' style
+    container_keys = ("locationReviews", "locations")
+    reviews_key = "reviews"
+
+    def _star_to_int(v: Any) -> Optional[int]:
+        if v is None:
+            return None
+        if isinstance(v, (int, float)):
+            try:
+                return int(v)
+            except Exception:
+                return None
+        if isinstance(v, str):
+            mapping = {
+                "ONE": 1,
+                "TWO": 2,
+                "THREE": 3,
+                "FOUR": 4,
+                "FIVE": 5,
+                "1": 1,
+                "2": 2,
+                "3": 3,
+                "4": 4,
+                "5": 5,
+            }
+            return mapping.get(v.upper())
+        return None
+
+    containers = []
+    if isinstance(data, dict):
+        for ck in container_keys:
+            val = data.get(ck)
+            if isinstance(val, list):
+                containers = val
+                break
+        if not containers and isinstance(data.get(reviews_key), list):
+            # Top-level 'reviews'
+            containers = [{"locationName": "", "reviews": data.get(reviews_key)}]
+    elif isinstance(data, list):
+        containers = data
+
+    for container in containers or []:
+        if not isinstance(container, dict):
+            continue
+        location_name = container.get("locationName") or titles.get(container.get("name") or "") or ""
+        # batchGetReviews returns one {"name", "review"} entry per review
+        reviews = container.get(reviews_key)
+        if reviews is None and isinstance(container.get("review"), dict):
+            reviews = [container["review"]]
+        for r in (reviews or []):
+            if not isinstance(r, dict):
+                continue
+            rid = r.get("reviewId") or r.get("name")
+            # Derive a stable integer id and namespace Google ids as negative to avoid conflicts
+            rid_int: Optional[int] = None
+            if isinstance(rid, int):
+                rid_int = -abs(rid)
+            elif isinstance(rid, str):
+                tail = rid.split("/")[-1]
+                try:
+                    rid_int = -abs(int(tail))
+                except Exception:
+                    rid_int = -abs(int(zlib.crc32(rid.encode("utf-8"))))
+            else:
+                continue
+
+            rating_int = _star_to_int(r.get("starRating") or r.get("rating"))
+            reviewer = r.get("reviewer") or {}
+            items.append(
+                {
+                    "id": rid_int,
+                    "type": "guest-to-host",
+                    "status": "published",
+                    "rating": rating_int,
+                    "publicReview": r.get("comment") or r.get("text") or "",
+                    "submittedAt": r.get("createTime") or r.get("updateTime") or "",
+                    "guestName": reviewer.get("displayName") or "Google User",
+                    "listingName": location_name,
+                    "channel": "Google",
+                    "hidden": False,
+                    "reviewCategory": [],
+                }
+            )
+    return items
@@ -0,0 +1,229 @@
+import asyncio
+import logging
+import os
+from datetime import datetime
+from typing import Any
+
+from app.http_client import get_http_client
+from app.token_cache import TokenCache
+
+# HOSTAWAY API
+HOSTAWAY_BASE_URL = os.getenv("HOSTAWAY_BASE_URL", "https://api.hostaway.com/v1").rstrip("/")
+HOSTAWAY_AUTH_URL = os.getenv("HOSTAWAY_AUTH_URL", f"{HOSTAWAY_BASE_URL}/accessTokens")
+HOSTAWAY_API_URL = os.getenv("HOSTAWAY_API_URL", f"{HOSTAWAY_BASE_URL}/reviews")
+HOSTAWAY_CLIENT_ID = os.getenv("HOSTAWAY_CLIENT_ID", "hostaway")
+HOSTAWAY_CLIENT_SECRET = os.getenv("HOSTAWAY_CLIENT_SECRET", "secret")
+HOSTAWAY_TIMEOUT_SECONDS = float(os.getenv("HOSTAWAY_TIMEOUT_SECONDS", "10"))
+HOSTAWAY_PAGE_SIZE = int(os.getenv("HOSTAWAY_PAGE_SIZE", "100"))
+# Max pages in flight at once
+HOSTAWAY_PAGE_CONCURRENCY = int(os.getenv("HOSTAWAY_PAGE_CONCURRENCY", "4"))
+# Upper bound on pages per fetch, in case the API keeps returning full pages
+HOSTAWAY_MAX_PAGES = int(os.getenv("HOSTAWAY_MAX_PAGES", "1000"))
+
+hostaway_token_cache = TokenCache("hostaway")
+logger = logging.getLogger(__name__)
+
+
+def hostaway_configured() -> bool:
+    # Only call Hostaway if client creds are provided
+    return bool(os.getenv("HOSTAWAY_CLIENT_ID") and os.getenv("HOSTAWAY_CLIENT_SECRET"))
+
+
+async def _mint_hostaway_access_token() -> tuple[str, float] | None:
+    try:
+        resp = await get_http_client().post(
+            HOSTAWAY_AUTH_URL,
+            headers={"Content-Type": "application/x-www-form-urlencoded"},
+            data={
+                "grant_type": "client_credentials",
+                "client_id": HOSTAWAY_CLIENT_ID,
+                "client_secret": HOSTAWAY_CLIENT_SECRET,
+                "scope": "general",
+            },
+            timeout=HOSTAWAY_TIMEOUT_SECONDS,
+        )
+        if resp.status_code == 200:
+            data = resp.json()
+            token = data.get("access_token")
+            if token:
+                return token, float(data.get("expires_in") or 0)
+        return None
+    except Exception:
+        return None
+
+
+async def get_hostaway_access_token() -> str | None:
+    # Tokens are long-lived; reuse the cached one until it nears expiry
+    return await hostaway_token_cache.aget(_mint_hostaway_access_token)
+
+
+async def _get_reviews_page(offset: int, since: datetime | None) -> Any:
+    params: dict[str, Any] = {"limit": HOSTAWAY_PAGE_SIZE, "offset": offset}
+    if since is not None:
+        params["updatedSince"] = since.strftime("%Y-%m-%d %H:%M:%S")
+    client = get_http_client()
+    for attempt in range(2):
+        token = await get_hostaway_access_token()
+        if not token:
+            return None
+        resp = await client.get(
+            HOSTAWAY_API_URL,
+            params=params,
+            headers={"Authorization": f"Bearer {token}"},
+            timeout=HOSTAWAY_TIMEOUT_SECONDS,
+        )
+        if resp.status_code == 401 and attempt == 0:
+            # Token revoked before expiry: mint a fresh one (unless another request already did) and retry once
+            await asyncio.to_thread(hostaway_token_cache.invalidate, token)
+            continue
+        if resp.status_code == 200:
+            return resp.json()
+        return None
+    return None
+
+
+async def get_hostaway_reviews(since: datetime | None = None) -> list[dict] | None:
+    """Fetch reviews updated since ``since`` (all when None), page by page.
+
+    Pages are requested with limit/offset, up to HOSTAWAY_PAGE_CONCURRENCY at
+    a time, and normalized as they arrive. Returns None if any page fails so
+    the caller doesn't advance its watermark past missing data; the same goes
+    for running into HOSTAWAY_MAX_PAGES. Without a total count, paging also
+    stops at a full page that brings no new review ids (an API that ignores
+    the offset).
+    """
+    try:
+        first = await _get_reviews_page(0, since)
+        if first is None:
+            return None
+        items = normalize_hostaway_response(first)
+        if len(_review_list(first)) < HOSTAWAY_PAGE_SIZE:
+            return items
+
+        semaphore = asyncio.Semaphore(HOSTAWAY_PAGE_CONCURRENCY)
+
+        async def fetch(offset: int) -> Any:
+            async with semaphore:
+                return await _get_reviews_page(offset, since)
+
+        total = first.get("count") if isinstance(first, dict) else None
+        if isinstance(total, int):
+            # Total is known: request every remaining page up front
+            offsets = range(HOSTAWAY_PAGE_SIZE, total, HOSTAWAY_PAGE_SIZE)
+            if len(offsets) + 1 > HOSTAWAY_MAX_PAGES:
+                logger.warning(
+                    "Hostaway reports %d reviews, more than HOSTAWAY_MAX_PAGES=%d pages", total, HOSTAWAY_MAX_PAGES
+                )
+                return None
+            for page in await asyncio.gather(*(fetch(o) for o in offsets)):
+                if page is None:
+                    return None
+                items.extend(normalize_hostaway_response(page))
+            return items
+
+        # Unknown total: fetch a window of pages at a time until one comes back short
+        seen = {item["id"] for item in items}
+        offset = HOSTAWAY_PAGE_SIZE
+        pages_fetched = 1
+        while True:
+            offsets = [offset + i * HOSTAWAY_PAGE_SIZE for i in range(HOSTAWAY_PAGE_CONCURRENCY)]
+            pages = await asyncio.gather(*(fetch(o) for o in offsets))
+            for page in pages:
+                if page is None:
+                    return None
+                pages_fetched += 1
+                page_items = normalize_hostaway_response(page)
+                new_items = [item for item in page_items if item["id"] not in seen]
+                if page_items and not new_items:
+                    logger.warning("Hostaway page at offset %d repeated earlier reviews; stopping", offset)
+                    return items
+                seen.update(item["id"] for item in new_items)
+                items.extend(new_items)
+                if len(_review_list(page)) < HOSTAWAY_PAGE_SIZE:
+                    return items
+                if pages_fetched >= HOSTAWAY_MAX_PAGES:
+                    logger.warning("Hostaway paging hit HOSTAWAY_MAX_PAGES=%d without a short page", HOSTAWAY_MAX_PAGES)
+                    return None
+                offset += HOSTAWAY_PAGE_SIZE
+    except Exception:
+        return None
+
+
+def _review_list(data: Any) -> list:
+    # Try to find the list of reviews in common keys
+    if isinstance(data, dict):
+        for key in ("result", "results", "data", "reviews", "list"):
+            val = data.get(key)
+            if isinstance(val, list):
+                return val
+        for val in data.values():
+            if isinstance(val, list):
+                return val
+    elif isinstance(data, list):
+        return data
+    return []
+
+
+def normalize_hostaway_response(data: Any) -> list[dict]:
+    """Normalize Hostaway API response to canonical Review dicts."""
+    items: list[dict] = []
+    if not data:
+        return items
+    for it in _review_list(data):
+        if not isinstance(it, dict):
+            continue
+        rid = it.get("id") or it.get("reviewId") or it.get("reservationId")
+        try:
+            rid_int = int(rid) if rid is not None else None
+        except Exception:
+            # skip items without a usable integer id
+            continue
+        rating_val = it.get("rating") or it.get("overall") or it.get("stars")
+        try:
+            rating_int = int(rating_val) if rating_val is not None else None
+        except Exception:
+            rating_int = None
+        # Categories can be list or dict
+        categories: list[dict] = []
+        rc = it.get("reviewCategory") or it.get("categories") or it.get("ratings") or it.get("scores") or {}
+        if isinstance(rc, list):
+            for c in rc:
+                if not isinstance(c, dict):
+                    continue
+                cat = c.get("category") or c.get("name")
+                score = c.get("rating") or c.get("score") or c.get("value")
+                if cat is not None and score is not None:
+                    try:
+                        categories.append({"category": str(cat), "rating": int(score)})
+                    except Exception:
+                        pass
+        elif isinstance(rc, dict):
+            for cat, score in rc.items():
+                if score is not None:
+                    try:
+                        categories.append({"category": str(cat), "rating": int(score)})
+                    except Exception:
+                        pass
+        # Fallback specific keys for known categories
+        for key in ("cleanliness", "communication", "respect_house_rules", "accuracy", "location", "value", "check_in"):
+            if key in it and it.get(key) is not None:
+                try:
+                    categories.append({"category": key, "rating": int(it.get(key))})
+                except Exception:
+                    pass
+        items.append(
+            {
+                "id": rid_int,
+                "type": it.get("type", "host-to-guest"),
+                "status": it.get("status", "published"),
+                "rating": rating_int,
+                "publicReview": it.get("publicReview") or it.get("comment") or it.get("review") or it.get("text") or "",
+                "submittedAt": it.get("submittedAt") or it.get("createdAt") or it.get("createTime") or "",
+                "guestName": it.get("guestName") or (it.get("guest") or {}).get("name") or (it.get("reviewer") or {}).get("displayName") or "",
+                "listingName": it.get("listingName") or (it.get("listing") or {}).get("name") or it.get("propertyName") or "",
+                "channel": it.get("channel") or it.get("source") or "Hostaway",
+                "hidden": False,
+                "reviewCategory": categories,
+            }
+        )
+    return items
@@ -0,0 +1,88 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+# Serialized GET /api/reviews/hostaway responses, per worker process
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "256"))
+# Keys come from public query parameters, so memory is bounded by size as well as count
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+# Larger bodies are served but never cached
+RESPONSE_CACHE_MAX_ENTRY_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRY_BYTES", str(4 * 1024 * 1024)))
+# Bounds staleness across workers, which don't see each other's invalidations; 0 disables
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "30"))
+
+
+class ResponseCache:
+    """TTL + LRU cache of rendered responses, invalidated by a version counter.
+
+    Writers call ``invalidate`` after committing, which bumps ``version``.
+    Readers capture ``version`` before querying and pass it to ``put``; an
+    entry computed from data older than the current version is never served,
+    even if it was stored after the invalidation.
+
+    Least recently used entries are evicted once either ``max_entries`` or
+    ``max_bytes`` (the sum of the sizes given to ``put``) is exceeded.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = RESPONSE_CACHE_MAX_ENTRIES,
+        ttl: float = RESPONSE_CACHE_TTL_SECONDS,
+        max_bytes: int = RESPONSE_CACHE_MAX_BYTES,
+        max_entry_bytes: int = RESPONSE_CACHE_MAX_ENTRY_BYTES,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.version = 0
+        self.size = 0
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Hashable, tuple[int, float, int, Any]] = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_entries > 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        version, expires_at, _, value = entry
+        if version != self.version or time.monotonic() >= expires_at:
+            with self._lock:
+                self._discard(key)
+            return None
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: Hashable, value: Any, version: int, size: int) -> None:
+        """Store ``value``, which takes about ``size`` bytes."""
+        if not self.enabled or version != self.version or size > min(self.max_entry_bytes, self.max_bytes):
+            return
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = (version, time.monotonic() + self.ttl, size, value)
+            self.size += size
+            while len(self._entries) > self.max_entries or self.size > self.max_bytes:
+                _, (_, _, evicted, _) = self._entries.popitem(last=False)
+                self.size -= evicted
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self.version += 1
+            self._entries.clear()
+            self.size = 0
+
+    def _discard(self, key: Hashable) -> None:
+        # Caller holds the lock
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry[2]
+
+
+reviews_cache = ResponseCache()
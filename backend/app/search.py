@@ -0,0 +1,107 @@
+"""Full-text search over publicReview, guestName and listingName.
+
+SQLite uses an external-content FTS5 table (reviews_fts) kept in sync with
+reviews by triggers, so every write path (upserts included) maintains it.
+Postgres uses a generated tsvector column with a GIN index. Other backends
+fall back to a case-insensitive LIKE without ranking or snippets.
+"""
+import html
+import re
+from typing import Any, Optional
+
+from sqlalchemy import Connection, Select, and_, column, func, literal_column, or_, table
+
+from app.models.sql_models import Review
+
+SEARCH_FIELDS = ("publicReview", "guestName", "listingName")
+MAX_SEARCH_TERMS = 8
+SNIPPET_WORDS = 16
+# Sentinels wrapped around matches by the database; replaced after HTML-escaping
+_HIGHLIGHT_START, _HIGHLIGHT_END = "\x02", "\x03"
+
+_reviews_fts = table("reviews_fts", column("rowid"), column("rank"))
+
+
+def search_terms(q: Optional[str]) -> list[str]:
+    # Word characters only, so user input can't inject FTS/tsquery syntax
+    return re.findall(r"[^\W_]+", (q or "").lower())[:MAX_SEARCH_TERMS]
+
+
+def apply_search(query: Select, terms: list[str], dialect: str) -> tuple[Select, Optional[Any], Optional[Any]]:
+    """Restrict ``query`` to reviews matching every term (each as a prefix).
+
+    Returns the query, a relevance expression (higher is better) and a
+    snippet expression; the last two are None where unsupported.
+    """
+    if dialect == "sqlite":
+        match = " ".join(f'"{t}"*' for t in terms)
+        query = query.join(_reviews_fts, _reviews_fts.c.rowid == Review.id).where(
+            literal_column("reviews_fts").op("MATCH")(match)
+        )
+        # FTS5's rank is bm25, where more negative means more relevant
+        relevance = -_reviews_fts.c.rank
+        snippet = func.snippet(
+            literal_column("reviews_fts"), -1, _HIGHLIGHT_START, _HIGHLIGHT_END, "…", SNIPPET_WORDS
+        )
+        return query, relevance, snippet
+
+    if dialect == "postgresql":
+        tsquery = func.to_tsquery("simple", " & ".join(f"{t}:*" for t in terms))
+        vector = literal_column("reviews.search_vector")
+        query = query.where(vector.op("@@")(tsquery))
+        relevance = func.ts_rank_cd(vector, tsquery)
+        snippet = func.ts_headline(
+            "simple",
+            Review.publicReview,
+            tsquery,
+            f"StartSel={_HIGHLIGHT_START}, StopSel={_HIGHLIGHT_END}, MaxWords={SNIPPET_WORDS}, MinWords=6",
+        )
+        return query, relevance, snippet
+
+    conditions = [
+        or_(*(getattr(Review, field).ilike(f"%{term}%") for field in SEARCH_FIELDS)) for term in terms
+    ]
+    return query.where(and_(*conditions)), None, None
+
+
+def render_snippet(raw: Optional[str]) -> Optional[str]:
+    """HTML-escape a snippet and mark matches with <mark>, so it is safe to render."""
+    if raw is None:
+        return None
+    escaped = html.escape(raw, quote=False)
+    return escaped.replace(_HIGHLIGHT_START, "<mark>").replace(_HIGHLIGHT_END, "</mark>")
+
+
+def create_search_index(conn: Connection) -> None:
+    """Create the backend's search index and populate it from existing rows."""
+    dialect = conn.dialect.name
+    if dialect == "sqlite":
+        cols = ", ".join(f'"{f}"' for f in SEARCH_FIELDS)
+        new = ", ".join(f'new."{f}"' for f in SEARCH_FIELDS)
+        old = ", ".join(f'old."{f}"' for f in SEARCH_FIELDS)
+        conn.exec_driver_sql(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS reviews_fts USING fts5({cols}, content='reviews', "
+            "content_rowid='id', tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+        )
+        conn.exec_driver_sql(
+            "CREATE TRIGGER IF NOT EXISTS reviews_fts_ai AFTER INSERT ON reviews BEGIN "
+            f"INSERT INTO reviews_fts(rowid, {cols}) VALUES (new.id, {new}); END"
+        )
+        conn.exec_driver_sql(
+            "CREATE TRIGGER IF NOT EXISTS reviews_fts_ad AFTER DELETE ON reviews BEGIN "
+            f"INSERT INTO reviews_fts(reviews_fts, rowid, {cols}) VALUES ('delete', old.id, {old}); END"
+        )
+        # Only the indexed columns; hide/show and hash updates don't touch the index
+        conn.exec_driver_sql(
+            f"CREATE TRIGGER IF NOT EXISTS reviews_fts_au AFTER UPDATE OF {cols} ON reviews BEGIN "
+            f"INSERT INTO reviews_fts(reviews_fts, rowid, {cols}) VALUES ('delete', old.id, {old}); "
+            f"INSERT INTO reviews_fts(rowid, {cols}) VALUES (new.id, {new}); END"
+        )
+        conn.exec_driver_sql("INSERT INTO reviews_fts(reviews_fts) VALUES ('rebuild')")
+    elif dialect == "postgresql":
+        document = " || ' ' || ".join(f"coalesce(\"{f}\", '')" for f in SEARCH_FIELDS)
+        conn.exec_driver_sql(
+            "ALTER TABLE reviews ADD COLUMN IF NOT EXISTS search_vector tsvector "
+            f"GENERATED ALWAYS AS (to_tsvector('simple', {document})) STORED"
+        )
+        conn.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_reviews_search ON reviews USING GIN (search_vector)")
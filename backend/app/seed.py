@@ -1,7 +1,9 @@
+import hashlib
 import json
 import os
 from sqlalchemy.orm import Session
-from .models.sql_models import Review, ReviewCategory
+from .api.reviews import upsert_reviews_from_normalized
+from .models.sql_models import AppMetadata, Review
 
 
 def seed_from_json(db: Session, json_path: str) -> int:
@@ -17,31 +19,8 @@ def seed_from_json(db: Session, json_path: str) -> int:
         payload = json.load(f)
     items = payload.get("result", [])
 
-    count = 0
-    for it in items:
-        review = Review(
-            id=it.get("id"),
-            type=it.get("type", "host-to-guest"),
-            status=it.get("status", "published"),
-            rating=it.get("rating"),
-            publicReview=it.get("publicReview", ""),
-            submittedAt=it.get("submittedAt", ""),
-            guestName=it.get("guestName", ""),
-            listingName=it.get("listingName", ""),
-            channel=it.get("channel"),
-            hidden=False,
-        )
-        for c in it.get("reviewCategory", []) or []:
-            review.reviewCategory.append(
-                ReviewCategory(
-                    category=c.get("category", ""),
-                    rating=int(c.get("rating", 0)),
-                )
-            )
-        db.add(review)
-        count += 1
-    db.commit()
-    return count
+    # Goes through the upsert path so rows get their content hash up front
+    return upsert_reviews_from_normalized(db, items)["created"]
 
 
 def sync_public_reviews(db: Session, json_path: str) -> int:
@@ -68,68 +47,49 @@ def sync_public_reviews(db: Session, json_path: str) -> int:
 
 def sync_all_from_json(db: Session, json_path: str) -> dict:
     if not os.path.exists(json_path):
-        return {"updated": 0, "created": 0}
+        return {"updated": 0, "created": 0, "unchanged": 0}
     with open(json_path, "r", encoding="utf-8") as f:
         payload = json.load(f)
     items = payload.get("result", [])
 
-    updated = 0
-    created = 0
+    # Rows whose content hash is unchanged are skipped; 'hidden' is preserved
+    return upsert_reviews_from_normalized(db, items)
 
-    for it in items:
-        rid = it.get("id")
-        if not rid:
-            continue
-        row = db.get(Review, rid)
-        if row:
-            # Preserve admin-controlled 'hidden'
-            row.type = it.get("type", row.type)
-            row.status = it.get("status", row.status)
-            row.rating = it.get("rating")
-            row.publicReview = it.get("publicReview", row.publicReview)
-            row.submittedAt = it.get("submittedAt", row.submittedAt)
-            row.guestName = it.get("guestName", row.guestName)
-            row.listingName = it.get("listingName", row.listingName)
-            row.channel = it.get("channel", row.channel)
-
-            # Replace categories
-            # Delete existing categories
-            for c in list(row.reviewCategory or []):
-                db.delete(c)
-            # Add fresh categories
-            for c in (it.get("reviewCategory") or []):
-                row.reviewCategory.append(
-                    ReviewCategory(
-                        category=c.get("category", ""),
-                        rating=int(c.get("rating", 0)),
-                    )
-                )
-            db.add(row)
-            updated += 1
-        else:
-            # Create
-            row = Review(
-                id=rid,
-                type=it.get("type", "host-to-guest"),
-                status=it.get("status", "published"),
-                rating=it.get("rating"),
-                publicReview=it.get("publicReview", ""),
-                submittedAt=it.get("submittedAt", ""),
-                guestName=it.get("guestName", ""),
-                listingName=it.get("listingName", ""),
-                channel=it.get("channel"),
-                hidden=False,
-            )
-            for c in (it.get("reviewCategory") or []):
-                row.reviewCategory.append(
-                    ReviewCategory(
-                        category=c.get("category", ""),
-                        rating=int(c.get("rating", 0)),
-                    )
-                )
-            db.add(row)
-            created += 1
-
-    if updated or created:
-        db.commit()
-    return {"updated": updated, "created": created}
+
+def _seed_fingerprint_key(json_path: str) -> str:
+    return f"seed:{os.path.basename(json_path)}"
+
+
+def sync_seed_if_changed(db: Session, json_path: str) -> dict | None:
+    """Seed an empty DB, then re-sync from the JSON only if the file changed.
+
+    The file's mtime/size and sha256 are stored in app_metadata. An unchanged
+    mtime/size skips the sync without reading the file; a touched but
+    identical file is hashed once and skipped. Returns the sync counts, or
+    None when nothing had to be done.
+    """
+    if not os.path.exists(json_path):
+        return None
+    seeded = seed_from_json(db, json_path)
+
+    stat = os.stat(json_path)
+    key = _seed_fingerprint_key(json_path)
+    row = db.get(AppMetadata, key)
+    stored = json.loads(row.value) if row else {}
+    if not seeded and stored.get("mtime") == stat.st_mtime and stored.get("size") == stat.st_size:
+        return None
+
+    with open(json_path, "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+    result = None
+    if not seeded and stored.get("sha256") != digest:
+        # Fully synchronize DB rows and categories with the JSON while preserving 'hidden'
+        result = sync_all_from_json(db, json_path)
+
+    value = json.dumps({"mtime": stat.st_mtime, "size": stat.st_size, "sha256": digest})
+    if row:
+        row.value = value
+    else:
+        db.add(AppMetadata(key=key, value=value))
+    db.commit()
+    return result
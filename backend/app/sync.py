@@ -0,0 +1,188 @@
+import asyncio
+import logging
+import os
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.api.reviews import aupsert_reviews_from_normalized
+from app.db import AsyncSessionLocal, SessionLocal
+from app.models.sql_models import SyncState
+from app.providers.google import get_google_business_profile_reviews, google_configured
+from app.providers.hostaway import get_hostaway_reviews, hostaway_configured
+
+logger = logging.getLogger(__name__)
+
+# Background provider sync (Hostaway / Google)
+SYNC_ENABLED = os.getenv("SYNC_ENABLED", "true").lower() not in ("0", "false", "no")
+SYNC_INTERVAL_SECONDS = float(os.getenv("SYNC_INTERVAL_SECONDS", "900"))
+SYNC_JITTER_SECONDS = float(os.getenv("SYNC_JITTER_SECONDS", "60"))
+# Upper bound on how long one run may hold the lease before another worker takes over
+SYNC_LEASE_SECONDS = float(os.getenv("SYNC_LEASE_SECONDS", "600"))
+# How long shutdown waits for an in-flight run before cancelling it
+SYNC_SHUTDOWN_GRACE_SECONDS = float(os.getenv("SYNC_SHUTDOWN_GRACE_SECONDS", "5"))
+SYNC_STATE_NAME = "providers"
+# Each provider also gets a sync_state row whose watermark is its last complete fetch
+PROVIDERS = ("hostaway", "google")
+WATERMARK_OVERLAP = timedelta(minutes=5)
+
+# In-process single-flight guard; the lease in sync_state covers other workers
+_sync_lock = asyncio.Lock()
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def providers_configured() -> bool:
+    return hostaway_configured() or google_configured()
+
+
+async def fetch_provider_reviews(
+    watermarks: dict[str, datetime | None] | None = None,
+) -> tuple[list[dict], list[str], list[str]]:
+    """Fetch and normalize reviews from every configured provider concurrently.
+
+    Returns the combined items, the names of the providers whose fetch
+    completed (i.e. whose watermark may be advanced) and the names of the
+    configured providers whose fetch failed.
+    """
+    watermarks = watermarks or {}
+    fetches: dict[str, Any] = {}
+    if hostaway_configured():
+        since = watermarks.get("hostaway")
+        # Overlap the window a little to absorb provider clock skew
+        fetches["hostaway"] = get_hostaway_reviews(since - WATERMARK_OVERLAP if since else None)
+    if google_configured():
+        fetches["google"] = get_google_business_profile_reviews()
+
+    combined: list[dict] = []
+    succeeded: list[str] = []
+    failed: list[str] = []
+    results = await asyncio.gather(*fetches.values(), return_exceptions=True)
+    for name, result in zip(fetches, results):
+        if isinstance(result, Exception) or result is None:
+            # One provider failing shouldn't drop the other's reviews
+            logger.warning("Provider fetch failed for %s: %r", name, result)
+            failed.append(name)
+            continue
+        combined.extend(result)
+        succeeded.append(name)
+    return combined, succeeded, failed
+
+
+def _load_watermarks() -> dict[str, datetime | None]:
+    with SessionLocal() as db:
+        rows = db.query(SyncState).filter(SyncState.name.in_(PROVIDERS)).all()
+        return {r.name: r.watermark for r in rows}
+
+
+def _acquire_lease(db: Session, now: datetime) -> bool:
+    if db.get(SyncState, SYNC_STATE_NAME) is None:
+        try:
+            db.add(SyncState(name=SYNC_STATE_NAME))
+            db.commit()
+        except IntegrityError:
+            # Another worker created the row first
+            db.rollback()
+    result = db.execute(
+        update(SyncState)
+        .where(
+            SyncState.name == SYNC_STATE_NAME,
+            or_(SyncState.lease_until.is_(None), SyncState.lease_until < now),
+        )
+        .values(lease_until=now + timedelta(seconds=SYNC_LEASE_SECONDS), last_attempt_at=now)
+    )
+    db.commit()
+    return result.rowcount == 1
+
+
+def _release_lease(db: Session, started_at: datetime, error: str | None = None) -> None:
+    values: dict = {"lease_until": None, "last_error": error}
+    if error is None:
+        values["watermark"] = started_at
+    db.execute(update(SyncState).where(SyncState.name == SYNC_STATE_NAME).values(**values))
+    db.commit()
+
+
+def _try_acquire_lease(now: datetime) -> bool:
+    with SessionLocal() as db:
+        return _acquire_lease(db, now)
+
+
+async def _store_results(items: list[dict], succeeded: list[str], failed: list[str], started_at: datetime) -> dict:
+    async with AsyncSessionLocal() as db:
+        if items:
+            result = await aupsert_reviews_from_normalized(db, items)
+        else:
+            result = {"updated": 0, "created": 0, "unchanged": 0}
+        for name in succeeded + failed:
+            state = await db.get(SyncState, name) or SyncState(name=name)
+            state.last_attempt_at = started_at
+            if name in failed:
+                state.last_error = "fetch failed"
+            else:
+                state.watermark = started_at
+                state.last_error = None
+            db.add(state)
+        await db.commit()
+        # The run only counts as a success (and advances its watermark) when every provider did
+        error = f"Provider fetch failed: {', '.join(failed)}" if failed else None
+        await db.run_sync(_release_lease, started_at, error)
+        return result
+
+
+def _record_failure(started_at: datetime, error: str) -> None:
+    with SessionLocal() as db:
+        _release_lease(db, started_at, error=error)
+
+
+async def run_sync_once() -> dict | None:
+    """Run a single provider sync if no other run is in flight.
+
+    Returns the upsert counts, or None when the run was skipped because
+    another task or worker holds the lease, or when it failed. A run where
+    only some providers failed stores what was fetched and returns its
+    counts, but is recorded with an error.
+    """
+    if _sync_lock.locked():
+        return None
+    async with _sync_lock:
+        started_at = _utcnow()
+        # Lease bookkeeping is blocking; run it in the threadpool
+        if not await asyncio.to_thread(_try_acquire_lease, started_at):
+            return None
+        try:
+            watermarks = await asyncio.to_thread(_load_watermarks)
+            items, succeeded, failed = await fetch_provider_reviews(watermarks)
+            result = await _store_results(items, succeeded, failed, started_at)
+            return result if succeeded or not failed else None
+        except asyncio.CancelledError:
+            # Shutdown cancelled the run: free the lease now rather than when it expires
+            await asyncio.to_thread(_record_failure, started_at, "cancelled")
+            raise
+        except Exception as exc:
+            logger.exception("Provider sync failed")
+            await asyncio.to_thread(_record_failure, started_at, repr(exc))
+            return None
+
+
+async def run_scheduler(stop: asyncio.Event) -> None:
+    """Run provider syncs every SYNC_INTERVAL_SECONDS (+ jitter) until stopped."""
+    # Spread the first run so workers booting together don't all hit the providers at once
+    delay = random.uniform(0, SYNC_JITTER_SECONDS)
+    while True:
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=delay)
+            return
+        except asyncio.TimeoutError:
+            pass
+        try:
+            await run_sync_once()
+        except Exception:
+            logger.exception("Provider sync scheduler iteration failed")
+        delay = SYNC_INTERVAL_SECONDS + random.uniform(0, SYNC_JITTER_SECONDS)
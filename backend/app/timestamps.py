@@ -0,0 +1,31 @@
+import re
+from datetime import datetime, timezone
+from typing import Any
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def parse_timestamp(value: Any) -> datetime:
+    """Parse a provider timestamp to naive UTC.
+
+    Handles Hostaway's "YYYY-MM-DD HH:MM:SS" (taken as UTC) and RFC3339 with
+    'Z' or an offset. Unparseable values map to the epoch, which is where the
+    dashboard has always sorted them.
+    """
+    if isinstance(value, datetime):
+        dt = value
+    else:
+        text = str(value or "").strip()
+        if not text:
+            return EPOCH
+        if text[-1] in "Zz":
+            text = text[:-1] + "+00:00"
+        # Python 3.10's fromisoformat only takes 3 or 6 fractional digits
+        text = re.sub(r"\.(\d+)", lambda m: "." + (m.group(1) + "000000")[:6], text, count=1)
+        try:
+            dt = datetime.fromisoformat(text)
+        except ValueError:
+            return EPOCH
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
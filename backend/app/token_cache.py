@@ -0,0 +1,169 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to in-process locking only
+    fcntl = None
+
+# Shared across uvicorn workers on the same host
+TOKEN_CACHE_PATH = os.getenv("TOKEN_CACHE_PATH", ".token_cache.json")
+# Refresh this many seconds before expiry (capped at 10% of the token lifetime)
+TOKEN_REFRESH_MARGIN_SECONDS = float(os.getenv("TOKEN_REFRESH_MARGIN_SECONDS", "300"))
+# Assumed lifetime when the provider omits expires_in
+DEFAULT_TOKEN_TTL_SECONDS = 3600
+
+Fetcher = Callable[[], Optional[tuple[str, float]]]
+AsyncFetcher = Callable[[], Awaitable[Optional[tuple[str, float]]]]
+
+
+class TokenCache:
+    """Caches one access token in memory and in a small JSON file.
+
+    ``get`` returns the cached token while it is fresh. Once it enters the
+    refresh window a single caller (per process, and per host via an flock on
+    the cache file) mints a new one with ``fetch``; everyone else waits and
+    reuses the result. ``fetch`` returns ``(token, expires_in_seconds)`` or
+    None on failure, in which case a token that has not actually expired yet
+    is still returned.
+    """
+
+    def __init__(self, name: str, path: str = TOKEN_CACHE_PATH) -> None:
+        self.name = name
+        self.path = path
+        self._lock = threading.Lock()
+        self._async_lock = asyncio.Lock()
+        self._token: Optional[str] = None
+        self._expires_at = 0.0
+        self._issued_at = 0.0
+
+    def _fresh(self, now: float) -> bool:
+        if not self._token:
+            return False
+        margin = min(TOKEN_REFRESH_MARGIN_SECONDS, (self._expires_at - self._issued_at) * 0.1)
+        return now < self._expires_at - margin
+
+    def _usable(self, now: float) -> bool:
+        return bool(self._token) and now < self._expires_at
+
+    def _acquire_file_lock(self):
+        try:
+            fh = open(self.path + ".lock", "a") if fcntl is not None else None
+        except OSError:
+            return None
+        if fh is not None:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+        return fh
+
+    @staticmethod
+    def _release_file_lock(fh) -> None:
+        if fh is not None:
+            fcntl.flock(fh, fcntl.LOCK_UN)
+            fh.close()
+
+    @contextmanager
+    def _file_lock(self):
+        fh = self._acquire_file_lock()
+        try:
+            yield
+        finally:
+            self._release_file_lock(fh)
+
+    def _read_store(self) -> dict:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except Exception:
+            return {}
+
+    def _load(self) -> None:
+        entry = self._read_store().get(self.name) or {}
+        token = entry.get("token")
+        if isinstance(token, str) and token:
+            self._token = token
+            self._expires_at = float(entry.get("expires_at", 0))
+            self._issued_at = float(entry.get("issued_at", 0))
+
+    def _write_store(self, data: dict) -> None:
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp, self.path)
+        except Exception:
+            # The in-memory copy still works if the file can't be written
+            pass
+
+    def _save(self) -> None:
+        data = self._read_store()
+        data[self.name] = {"token": self._token, "expires_at": self._expires_at, "issued_at": self._issued_at}
+        self._write_store(data)
+
+    def _store_token(self, token: str, expires_in: float, now: float) -> str:
+        self._token = token
+        self._issued_at = now
+        self._expires_at = now + float(expires_in or DEFAULT_TOKEN_TTL_SECONDS)
+        self._save()
+        return token
+
+    def get(self, fetch: Fetcher) -> Optional[str]:
+        if self._fresh(time.time()):
+            return self._token
+        with self._lock:
+            if self._fresh(time.time()):
+                return self._token
+            with self._file_lock():
+                # Another worker may have refreshed while we waited
+                self._load()
+                now = time.time()
+                if self._fresh(now):
+                    return self._token
+                result = fetch()
+                if result:
+                    return self._store_token(*result, now)
+                return self._token if self._usable(now) else None
+
+    async def aget(self, fetch: AsyncFetcher) -> Optional[str]:
+        """Async variant of ``get`` for fetchers that use the shared AsyncClient."""
+        if self._fresh(time.time()):
+            return self._token
+        async with self._async_lock:
+            if self._fresh(time.time()):
+                return self._token
+            # flock blocks, so wait for it off the event loop
+            fh = await asyncio.to_thread(self._acquire_file_lock)
+            try:
+                self._load()
+                now = time.time()
+                if self._fresh(now):
+                    return self._token
+                result = await fetch()
+                if result:
+                    return self._store_token(*result, now)
+                return self._token if self._usable(now) else None
+            finally:
+                self._release_file_lock(fh)
+
+    def invalidate(self, token: Optional[str] = None) -> None:
+        """Drop the cached token, e.g. after the provider rejected it.
+
+        With ``token``, only drop it if it is still the cached one: when
+        several requests are rejected at once, the first refresh serves them all.
+        """
+        with self._lock:
+            with self._file_lock():
+                self._load()
+                if token is not None and self._token != token:
+                    return
+                self._token = None
+                self._expires_at = self._issued_at = 0.0
+                data = self._read_store()
+                if data.pop(self.name, None) is not None:
+                    self._write_store(data)
@@ -0,0 +1,87 @@
+"""Compare review list serialization paths on the current database.
+
+    python scripts/bench_serialization.py --repeat 5
+
+``pydantic``: ORM rows with selectin-loaded categories, validated into
+ReviewResponse (from_attributes) and dumped with model_dump_json, as the
+endpoint did before the column-only path. ``fast``: column-only SELECT
+rendered by ``render_reviews`` (orjson). Both include the DB query. The
+script fails if the two produce different bytes.
+
+Run from backend/ against DATABASE_URL (run migrations first).
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+from app.api import reviews as api
+from app.db import AsyncReadSessionLocal
+from app.models.review import ReviewResponse
+from app.models.sql_models import Review as ReviewORM
+
+
+async def _pydantic_path() -> bytes:
+    async with AsyncReadSessionLocal() as db:
+        query = (
+            select(ReviewORM)
+            .options(selectinload(ReviewORM.reviewCategory))
+            .order_by(ReviewORM.submittedAtUtc.desc(), ReviewORM.id.desc())
+        )
+        rows = (await db.scalars(query)).all()
+        payload = {"status": "success", "result": rows}
+        return ReviewResponse.model_validate(payload, from_attributes=True).model_dump_json().encode("utf-8")
+
+
+async def _fast_path() -> bytes:
+    async with AsyncReadSessionLocal() as db:
+        query = select(*api._REVIEW_COLUMNS).order_by(ReviewORM.submittedAtUtc.desc(), ReviewORM.id.desc())
+        rows = (await db.execute(query)).all()
+        return api.render_reviews(await api._review_dicts(db, rows))
+
+
+async def _time(fn, repeat: int) -> tuple[list[float], bytes]:
+    timings = []
+    body = b""
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = await fn()
+        timings.append(time.perf_counter() - started)
+    return timings, body
+
+
+async def _run(repeat: int) -> int:
+    await _fast_path()  # warm up connections and statement caches
+    slow, slow_body = await _time(_pydantic_path, repeat)
+    fast, fast_body = await _time(_fast_path, repeat)
+    if slow_body != fast_body:
+        print("MISMATCH: serialized bodies differ")
+        return 1
+    # The stdlib fallback used when orjson is missing must match as well
+    fallback = json.dumps(json.loads(fast_body), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    if fallback != fast_body:
+        print("MISMATCH: stdlib fallback differs")
+        return 1
+
+    count = len(json.loads(fast_body)["result"])
+    print(f"{count} reviews, {len(fast_body)} bytes, identical output")
+    for name, timings in (("pydantic", slow), ("fast", fast)):
+        print(f"  {name:<9} median {statistics.median(timings) * 1000:8.1f} ms  min {min(timings) * 1000:8.1f} ms")
+    print(f"  speedup   {statistics.median(slow) / statistics.median(fast):.1f}x")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    return asyncio.run(_run(args.repeat))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
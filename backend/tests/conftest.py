@@ -0,0 +1,95 @@
+import os
+import tempfile
+
+# Point the app at throwaway storage before anything imports app.config / app.db
+_tmp = tempfile.mkdtemp(prefix="reviews-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp, 'test.db')}"
+os.environ["TOKEN_CACHE_PATH"] = os.path.join(_tmp, "token_cache.json")
+os.environ["SYNC_ENABLED"] = "false"
+
+import httpx  # noqa: E402
+import pytest  # noqa: E402
+
+from app import http_client  # noqa: E402
+from app.providers import hostaway  # noqa: E402
+from app.token_cache import TokenCache  # noqa: E402
+
+
+class HostawayStub:
+    """In-process stand-in for the Hostaway token and reviews endpoints.
+
+    Serves ``reviews`` with limit/offset paging, optionally without a
+    ``count``; returns 503 for offsets in ``fail_offsets`` and 401 for the
+    first ``revoked`` tokens it minted. With ``ignore_offset`` every request
+    gets the first page, like an API that doesn't page.
+    """
+
+    def __init__(
+        self,
+        reviews: list[dict],
+        with_count: bool = True,
+        fail_offsets=(),
+        revoked: int = 0,
+        ignore_offset: bool = False,
+    ) -> None:
+        self.reviews = reviews
+        self.with_count = with_count
+        self.ignore_offset = ignore_offset
+        self.fail_offsets = set(fail_offsets)
+        self.revoked = {f"token-{i}" for i in range(1, revoked + 1)}
+        self.tokens_minted = 0
+        # (offset, params, bearer token) per reviews request
+        self.requests: list[tuple[int, dict, str]] = []
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/accessTokens"):
+            self.tokens_minted += 1
+            return httpx.Response(200, json={"access_token": f"token-{self.tokens_minted}", "expires_in": 3600})
+        params = dict(request.url.params)
+        token = request.headers.get("Authorization", "").removeprefix("Bearer ")
+        offset, limit = int(params["offset"]), int(params["limit"])
+        self.requests.append((offset, params, token))
+        if token in self.revoked:
+            return httpx.Response(401)
+        if offset in self.fail_offsets:
+            return httpx.Response(503)
+        start = 0 if self.ignore_offset else offset
+        body = {"status": "success", "result": self.reviews[start : start + limit]}
+        if self.with_count:
+            body["count"] = len(self.reviews)
+        return httpx.Response(200, json=body)
+
+    @property
+    def offsets(self) -> list[int]:
+        return sorted(offset for offset, _, _ in self.requests)
+
+
+def make_reviews(n: int) -> list[dict]:
+    return [
+        {
+            "id": 1000 + i,
+            "type": "guest-to-host",
+            "status": "published",
+            "rating": None,
+            "publicReview": f"Review {i}",
+            "reviewCategory": [{"category": "cleanliness", "rating": 8 + i % 3}],
+            "submittedAt": f"2024-03-{i + 1:02d} 10:00:00",
+            "guestName": f"Guest {i}",
+            "listingName": "Test Listing",
+        }
+        for i in range(n)
+    ]
+
+
+@pytest.fixture
+def hostaway_stub(monkeypatch, tmp_path):
+    """Install a HostawayStub behind the shared HTTP client; call it with the stub's arguments."""
+    monkeypatch.setattr(hostaway, "HOSTAWAY_PAGE_SIZE", 2)
+    monkeypatch.setattr(hostaway, "hostaway_token_cache", TokenCache("hostaway", path=str(tmp_path / "token.json")))
+
+    def install(*args, **kwargs) -> HostawayStub:
+        stub = HostawayStub(*args, **kwargs)
+        monkeypatch.setattr(http_client, "_client", httpx.AsyncClient(transport=httpx.MockTransport(stub.handler)))
+        return stub
+
+    return install
@@ -0,0 +1,42 @@
+import asyncio
+import json
+
+import httpx
+
+from app import http_client
+from app.providers import google
+
+
+def test_locations_discovered_via_business_information(monkeypatch):
+    monkeypatch.setattr(google, "GOOGLE_BUSINESS_PROFILE_ACCOUNT_ID", "123")
+    monkeypatch.setattr(google, "GOOGLE_BUSINESS_PROFILE_LOCATION_NAMES", [])
+    monkeypatch.setattr(google, "_locations_cache", {})
+    monkeypatch.setattr(google, "get_google_service_account_access_token", lambda: "token")
+    location_requests: list[httpx.URL] = []
+    review_payloads: list[dict] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == "mybusinessbusinessinformation.googleapis.com":
+            location_requests.append(request.url)
+            if request.url.params.get("pageToken"):
+                return httpx.Response(200, json={"locations": [{"name": "locations/2", "title": "Loft"}]})
+            return httpx.Response(
+                200, json={"locations": [{"name": "locations/1", "title": "Studio"}], "nextPageToken": "p2"}
+            )
+        assert request.url.path == "/v4/accounts/123/locations:batchGetReviews"
+        payload = json.loads(request.content)
+        review_payloads.append(payload)
+        reviews = [
+            {"name": name, "review": {"reviewId": f"r{i}", "starRating": "FIVE", "comment": "Great"}}
+            for i, name in enumerate(payload["locationNames"])
+        ]
+        return httpx.Response(200, json={"locationReviews": reviews})
+
+    monkeypatch.setattr(http_client, "_client", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+
+    items = asyncio.run(google.get_google_business_profile_reviews())
+
+    assert [url.path for url in location_requests] == ["/v1/accounts/123/locations"] * 2
+    assert all(url.params["readMask"] == "name,title" for url in location_requests)
+    assert [p["locationNames"] for p in review_payloads] == [["accounts/123/locations/1", "accounts/123/locations/2"]]
+    assert [(item["listingName"], item["rating"]) for item in items] == [("Studio", 5), ("Loft", 5)]
@@ -0,0 +1,94 @@
+import asyncio
+from datetime import datetime
+
+from app import sync
+from app.db import SessionLocal
+from app.migrations import upgrade
+from app.models.sql_models import SyncState
+from app.providers import google, hostaway
+from app.providers.hostaway import get_hostaway_reviews
+
+from conftest import make_reviews
+
+
+def _ids(items):
+    return sorted(item["id"] for item in items)
+
+
+def test_pages_with_count(hostaway_stub):
+    stub = hostaway_stub(make_reviews(5))
+    items = asyncio.run(get_hostaway_reviews())
+    assert _ids(items) == [1000, 1001, 1002, 1003, 1004]
+    # The count is known after the first page, so exactly the remaining pages are requested
+    assert stub.offsets == [0, 2, 4]
+
+
+def test_pages_without_count_until_short_page(hostaway_stub):
+    stub = hostaway_stub(make_reviews(5), with_count=False)
+    items = asyncio.run(get_hostaway_reviews())
+    assert _ids(items) == [1000, 1001, 1002, 1003, 1004]
+    # First page, then one window of HOSTAWAY_PAGE_CONCURRENCY pages ending at the short page
+    assert stub.offsets == [0, 2, 4, 6, 8]
+
+
+def test_failing_page_returns_none(hostaway_stub):
+    hostaway_stub(make_reviews(5), fail_offsets={2})
+    assert asyncio.run(get_hostaway_reviews()) is None
+
+
+def test_failing_page_without_count_returns_none(hostaway_stub):
+    hostaway_stub(make_reviews(5), with_count=False, fail_offsets={4})
+    assert asyncio.run(get_hostaway_reviews()) is None
+
+
+def test_repeated_full_page_stops_paging(hostaway_stub):
+    stub = hostaway_stub(make_reviews(5), with_count=False, ignore_offset=True)
+    items = asyncio.run(get_hostaway_reviews())
+    assert _ids(items) == [1000, 1001]
+    assert stub.offsets == [0, 2, 4, 6, 8]
+
+
+def test_max_pages_without_count_returns_none(hostaway_stub, monkeypatch):
+    monkeypatch.setattr(hostaway, "HOSTAWAY_MAX_PAGES", 6)
+    stub = hostaway_stub(make_reviews(40), with_count=False)
+    assert asyncio.run(get_hostaway_reviews()) is None
+    # Stops within the window that reached the cap
+    assert stub.offsets == [2 * i for i in range(9)]
+
+
+def test_max_pages_with_count_returns_none(hostaway_stub, monkeypatch):
+    monkeypatch.setattr(hostaway, "HOSTAWAY_MAX_PAGES", 2)
+    stub = hostaway_stub(make_reviews(5))
+    assert asyncio.run(get_hostaway_reviews()) is None
+    assert stub.offsets == [0]
+
+
+def test_revoked_token_is_replaced_and_retried(hostaway_stub):
+    stub = hostaway_stub(make_reviews(1), revoked=1)
+    items = asyncio.run(get_hostaway_reviews())
+    assert _ids(items) == [1000]
+    assert stub.tokens_minted == 2
+    assert [token for _, _, token in stub.requests] == ["token-1", "token-2"]
+
+
+def test_updated_since_sent_from_stored_watermark(hostaway_stub, monkeypatch, tmp_path):
+    monkeypatch.setenv("HOSTAWAY_CLIENT_ID", "client")
+    monkeypatch.setenv("HOSTAWAY_CLIENT_SECRET", "secret")
+    monkeypatch.delenv("GOOGLE_SERVICE_ACCOUNT_JSON", raising=False)
+    monkeypatch.setattr(google, "GOOGLE_SERVICE_ACCOUNT_FILE", str(tmp_path / "missing.json"))
+    upgrade()
+    watermark = datetime(2024, 3, 10, 12, 0, 0)
+    with SessionLocal() as db:
+        state = db.get(SyncState, "hostaway") or SyncState(name="hostaway")
+        state.watermark = watermark
+        db.add(state)
+        db.commit()
+    stub = hostaway_stub(make_reviews(3))
+
+    result = asyncio.run(sync.run_sync_once())
+
+    assert result == {"updated": 0, "created": 3, "unchanged": 0}
+    expected = (watermark - sync.WATERMARK_OVERLAP).strftime("%Y-%m-%d %H:%M:%S")
+    assert [params.get("updatedSince") for _, params, _ in stub.requests] == [expected, expected]
+    with SessionLocal() as db:
+        assert db.get(SyncState, "hostaway").watermark > watermark
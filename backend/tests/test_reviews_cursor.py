@@ -0,0 +1,64 @@
+import base64
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.migrations import upgrade
+
+
+@pytest.fixture(scope="module")
+def client():
+    upgrade()
+    with TestClient(app) as c:
+        yield c
+
+
+def _cursor(value) -> str:
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).decode().rstrip("=")
+
+
+@pytest.mark.parametrize("sort", ["newest", "oldest", "highest", "lowest"])
+def test_cursor_pages_match_full_list(client, sort):
+    full = [r["id"] for r in client.get(f"/api/reviews/hostaway?sort={sort}").json()["result"]]
+    paged, cursor = [], None
+    while True:
+        params = {"sort": sort, "limit": 7, **({"cursor": cursor} if cursor else {})}
+        body = client.get("/api/reviews/hostaway", params=params).json()
+        paged += [r["id"] for r in body["result"]]
+        cursor = body.get("nextCursor")
+        if not cursor:
+            break
+    assert len(full) > 7
+    assert paged == full
+
+
+def test_cursor_from_another_sort_is_rejected(client):
+    cursor = client.get("/api/reviews/hostaway?sort=newest&limit=2").json()["nextCursor"]
+    resp = client.get("/api/reviews/hostaway", params={"sort": "highest", "limit": 2, "cursor": cursor})
+    assert resp.status_code == 400
+
+
+@pytest.mark.parametrize(
+    "sort, value",
+    [
+        ("highest", ["highest", [1], 5]),
+        ("highest", ["highest", {"a": 1}, 5]),
+        ("highest", ["highest", "9.5", 5]),
+        ("highest", ["highest", True, 5]),
+        ("newest", ["newest", 9.5, 5]),
+        ("newest", ["newest", "not a date", 5]),
+        ("newest", ["newest", "2024-01-01T00:00:00", "5"]),
+        ("newest", ["2024-01-01T00:00:00", 5]),
+    ],
+)
+def test_malformed_cursor_is_rejected(client, sort, value):
+    resp = client.get("/api/reviews/hostaway", params={"sort": sort, "limit": 2, "cursor": _cursor(value)})
+    assert resp.status_code == 400
+    assert resp.json()["detail"] == "Invalid cursor"
+
+
+def test_garbage_cursor_is_rejected(client):
+    resp = client.get("/api/reviews/hostaway", params={"limit": 2, "cursor": "not-base64!"})
+    assert resp.status_code == 400
@@ -0,0 +1,52 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.db import async_read_engine, engine
+from app.main import app
+from app.migrations import upgrade
+from app.response_cache import reviews_cache
+
+
+@pytest.fixture(scope="module")
+def client():
+    upgrade()
+    with TestClient(app) as c:
+        yield c
+
+
+@pytest.fixture
+def list_statements():
+    """Collect the (SQL, params) of the ordered review list SELECTs the read engine runs."""
+    captured: list[tuple[str, tuple]] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().startswith("SELECT") and "ORDER BY" in statement:
+            captured.append((statement, parameters))
+
+    reviews_cache.invalidate()
+    event.listen(async_read_engine.sync_engine, "before_cursor_execute", capture)
+    yield captured
+    event.remove(async_read_engine.sync_engine, "before_cursor_execute", capture)
+
+
+def _plan(statement: str, parameters: tuple) -> str:
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    return "\n".join(row[-1] for row in rows)
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        {"sort": "highest", "limit": 5},
+        {"sort": "lowest", "limit": 5},
+        {"sort": "highest", "limit": 5, "min_score": 7, "max_score": 9.5},
+    ],
+)
+def test_score_sorts_use_the_score_index(client, list_statements, params):
+    assert client.get("/api/reviews/hostaway", params=params).status_code == 200
+    assert list_statements
+    plan = _plan(*list_statements[0])
+    assert "ix_reviews_hidden_score" in plan
+    assert "TEMP B-TREE" not in plan
@@ -0,0 +1,56 @@
+import asyncio
+import time
+
+from fastapi.testclient import TestClient
+
+from app import main, sync
+from app.db import SessionLocal
+from app.migrations import upgrade
+from app.models.sql_models import SyncState
+
+
+def test_cancelled_run_releases_the_lease(monkeypatch):
+    upgrade()
+
+    async def hang(watermarks):
+        await asyncio.sleep(3600)
+
+    monkeypatch.setattr(sync, "fetch_provider_reviews", hang)
+
+    async def run_and_cancel():
+        task = asyncio.create_task(sync.run_sync_once())
+        await asyncio.sleep(0.1)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            return True
+        return False
+
+    assert asyncio.run(run_and_cancel())
+    with SessionLocal() as db:
+        state = db.get(SyncState, sync.SYNC_STATE_NAME)
+        assert state.lease_until is None
+        assert state.last_error == "cancelled"
+
+
+def test_shutdown_cancels_a_run_after_the_grace_period(monkeypatch):
+    cancelled = []
+
+    async def stuck_scheduler(stop):
+        # Ignores ``stop``, like a run blocked on a slow provider
+        try:
+            await asyncio.sleep(3600)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    monkeypatch.setattr(main, "SYNC_ENABLED", True)
+    monkeypatch.setattr(main, "providers_configured", lambda: True)
+    monkeypatch.setattr(main, "run_scheduler", stuck_scheduler)
+    monkeypatch.setattr(main, "SYNC_SHUTDOWN_GRACE_SECONDS", 0.1)
+
+    with TestClient(main.app):
+        started = time.monotonic()
+    assert time.monotonic() - started < 2
+    assert cancelled == [True]
@@ -0,0 +1,46 @@
+from app.token_cache import TokenCache
+
+
+def _minter():
+    minted = []
+
+    def fetch():
+        minted.append(f"token-{len(minted) + 1}")
+        return minted[-1], 3600
+
+    return fetch, minted
+
+
+def test_invalidate_only_drops_the_rejected_token(tmp_path):
+    cache = TokenCache("test", path=str(tmp_path / "tokens.json"))
+    fetch, minted = _minter()
+    assert cache.get(fetch) == "token-1"
+
+    # Two requests were rejected with token-1; the first refresh serves both
+    cache.invalidate("token-1")
+    assert cache.get(fetch) == "token-2"
+    cache.invalidate("token-1")
+    assert cache.get(fetch) == "token-2"
+    assert minted == ["token-1", "token-2"]
+
+
+def test_invalidate_sees_a_token_refreshed_by_another_process(tmp_path):
+    path = str(tmp_path / "tokens.json")
+    ours, theirs = TokenCache("test", path=path), TokenCache("test", path=path)
+    fetch, minted = _minter()
+    assert ours.get(fetch) == "token-1"
+    theirs.invalidate("token-1")
+    assert theirs.get(fetch) == "token-2"
+
+    # Our stale copy was rejected too, but the file already holds a newer token
+    ours.invalidate("token-1")
+    assert ours.get(fetch) == "token-2"
+    assert minted == ["token-1", "token-2"]
+
+
+def test_invalidate_without_token_always_drops(tmp_path):
+    cache = TokenCache("test", path=str(tmp_path / "tokens.json"))
+    fetch, minted = _minter()
+    cache.get(fetch)
+    cache.invalidate()
+    assert cache.get(fetch) == "token-2"
@@ -0,0 +1,56 @@
+import pytest
+from sqlalchemy import event, select
+
+from app.api.reviews import upsert_reviews_from_normalized
+from app.db import SessionLocal, engine
+from app.migrations import upgrade
+from app.models.sql_models import Review as ReviewORM
+
+
+@pytest.fixture(scope="module", autouse=True)
+def schema():
+    upgrade()
+
+
+def _items(start: int, n: int) -> list[dict]:
+    # Alternating null and non-null ratings/channels, with and without categories
+    return [
+        {
+            "id": start + i,
+            "type": "guest-to-host",
+            "status": "published",
+            "rating": None if i % 2 else 4,
+            "channel": None if i % 3 else "Airbnb",
+            "publicReview": f"Upsert {i}",
+            "submittedAt": "2024-05-01 10:00:00",
+            "guestName": "Guest",
+            "listingName": "Upsert Listing",
+            "reviewCategory": [] if i % 4 else [{"category": "cleanliness", "rating": 9}],
+        }
+        for i in range(n)
+    ]
+
+
+def test_mixed_null_rows_upsert_in_one_batch():
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    items = _items(700000, 60)
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        with SessionLocal() as db:
+            result = upsert_reviews_from_normalized(db, items)
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+
+    assert result == {"updated": 0, "created": 60, "unchanged": 0}
+    # One executemany for all reviews, whatever their null pattern
+    assert sum(s.lstrip().startswith("INSERT INTO reviews ") for s in statements) == 1
+    assert len(statements) < 15
+    with SessionLocal() as db:
+        ratings = db.execute(
+            select(ReviewORM.id, ReviewORM.rating, ReviewORM.channel).where(ReviewORM.id.between(700000, 700003))
+        ).all()
+    assert ratings == [(700000, 4, "Airbnb"), (700001, None, None), (700002, 4, None), (700003, None, "Airbnb")]
@@ -141,11 +141,12 @@ export default function Reviews() {
             const updated = hidden
               ? await showReview(id)
               : await hideReview(id);
+            // The response omits reviewCategory; keep the categories we already have
             setReviews((prev: HostawayReview[]) =>
-              prev.map((r) => (r.id === id ? updated : r))
+              prev.map((r) => (r.id === id ? { ...r, ...updated } : r))
             );
             setSelected((prev: HostawayReview | null) =>
-              prev && prev.id === id ? updated : prev
+              prev && prev.id === id ? { ...prev, ...updated } : prev
             );
             window.dispatchEvent(new Event("reviews-updated"));
           } catch (e) {
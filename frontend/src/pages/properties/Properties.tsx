@@ -1,24 +1,18 @@
-import { useEffect, useMemo, useState } from "react";
+import { useEffect, useState } from "react";
 import { Link } from "react-router-dom";
-import { getReviews } from "../../services/api";
-import { normalizeReviews, propertyMetrics } from "../../utils/analytics";
+import { getListingMetrics, type ListingMetrics } from "../../services/api";
 
 export default function Properties() {
-  const [reviews, setReviews] = useState([]);
+  const [metrics, setMetrics] = useState<ListingMetrics[]>([]);
   const [loading, setLoading] = useState(true);
 
   useEffect(() => {
     setLoading(true);
-    getReviews(true)
-      .then((data) => setReviews(data || []))
+    getListingMetrics()
+      .then((data) => setMetrics(data || []))
       .finally(() => setLoading(false));
   }, []);
 
-  const metrics = useMemo(
-    () => propertyMetrics(normalizeReviews(reviews)),
-    [reviews]
-  );
-
   if (loading) {
     return (
       <div className="space-y-4">
@@ -222,8 +222,13 @@ export default function PropertyDetails() {
             const updated = hidden
               ? await showReview(id)
               : await hideReview(id);
-            setReviews((prev) => prev.map((r) => (r.id === id ? updated : r)));
-            setSelected((prev) => (prev && prev.id === id ? updated : prev));
+            // The response omits reviewCategory; keep the categories we already have
+            setReviews((prev) =>
+              prev.map((r) => (r.id === id ? { ...r, ...updated } : r))
+            );
+            setSelected((prev) =>
+              prev && prev.id === id ? { ...prev, ...updated } : prev
+            );
             window.dispatchEvent(new Event("reviews-updated"));
           } catch (e) {
             console.error("Failed to toggle visibility", e);
@@ -20,6 +20,8 @@ export type HostawayReview = {
   listingName: string;
   channel: string;
   hidden: boolean;
+  // Mean category rating (1 dp, else rating), computed by the API on write
+  categoryAverage?: number | null;
 };
 
 export type NormalizedHostawayReview = {
@@ -15,19 +15,88 @@ export const clearAuthToken = () => {
   delete api.defaults.headers.common["Authorization"];
 };
 
-export const getReviews = async (includeHidden = false) => {
+export type ReviewQuery = {
+  type?: string;
+  channel?: string;
+  category?: string;
+  listing?: string;
+  since?: string;
+  until?: string;
+  min_score?: number;
+  max_score?: number;
+  // Full-text search; results default to relevance order and include a `snippet`
+  q?: string;
+  sort?: "newest" | "oldest" | "highest" | "lowest" | "relevance";
+  limit?: number;
+  cursor?: string;
+};
+
+export const getReviews = async (
+  includeHidden = false,
+  query: ReviewQuery = {}
+) => {
   if (includeHidden) {
     const token = localStorage.getItem("auth_token");
     if (token) api.defaults.headers.common["Authorization"] = `Bearer ${token}`;
     else delete api.defaults.headers.common["Authorization"];
   }
   const res = await api.get(`/reviews/hostaway`, {
-    params: { include_hidden: includeHidden },
+    params: { include_hidden: includeHidden, ...query },
   });
 
   return res.data.result;
 };
 
+export type ListingMetrics = {
+  slug: string;
+  name: string;
+  total: number;
+  visible: number;
+  avg: number | null;
+  channels: { [key: string]: number };
+  types: { [key: string]: number };
+  topIssues: { category: string; count: number }[];
+};
+
+export const getListingMetrics = async (): Promise<ListingMetrics[]> => {
+  const token = localStorage.getItem("auth_token");
+  if (token) api.defaults.headers.common["Authorization"] = `Bearer ${token}`;
+  const res = await api.get(`/reviews/metrics/listings`);
+  return res.data.result;
+};
+
+export type TrendPoint = {
+  month: string;
+  total: number;
+  visible: number;
+  avg: number | null;
+  categories: { [key: string]: number };
+  issues: { [key: string]: number };
+};
+
+export type ListingTrend = {
+  slug: string;
+  name: string;
+  total: number;
+  months: TrendPoint[];
+};
+
+export type TrendQuery = {
+  months?: number;
+  until?: string;
+  listing?: string;
+  channel?: string;
+};
+
+export const getTrends = async (
+  query: TrendQuery = {}
+): Promise<{ months: string[]; result: ListingTrend[] }> => {
+  const token = localStorage.getItem("auth_token");
+  if (token) api.defaults.headers.common["Authorization"] = `Bearer ${token}`;
+  const res = await api.get(`/reviews/metrics/trends`, { params: query });
+  return { months: res.data.months, result: res.data.result };
+};
+
 export const hideReview = async (id: number) => {
   const res = await api.patch(`/reviews/${id}/hide`);
   return res.data;
@@ -38,4 +107,17 @@ export const showReview = async (id: number) => {
   return res.data;
 };
 
+export type VisibilityResult = {
+  id: number;
+  result: "updated" | "unchanged" | "not_found";
+};
+
+export const setVisibility = async (
+  ids: number[],
+  hidden: boolean
+): Promise<{ updated: number; result: VisibilityResult[] }> => {
+  const res = await api.patch(`/reviews/visibility`, { ids, hidden });
+  return res.data;
+};
+
 export default api;
@@ -39,7 +39,10 @@ export const normalizeReviews = (
     const property = review?.listingName || "Unknown";
     const propertySlug = SLUG(property);
     const categoryAverage =
-      calculateAverageScore(review?.reviewCategory) ?? review?.rating ?? null;
+      review?.categoryAverage ??
+      calculateAverageScore(review?.reviewCategory) ??
+      review?.rating ??
+      null;
     const channel = review?.channel || "Direct";
     return {
       ...review,